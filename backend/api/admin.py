@@ -48,8 +48,9 @@ class ContactMessageAdmin(admin.ModelAdmin):
 
 @admin.register(Author)
 class AuthorAdmin(admin.ModelAdmin):
-    list_display = ('name', 'email')
+    list_display = ('name', 'email', 'user')
     search_fields = ('name', 'email')
+    raw_id_fields = ('user',)
 
 @admin.register(Blog)
 class BlogAdmin(admin.ModelAdmin):
@@ -77,3 +78,53 @@ class CommunityAdmin(admin.ModelAdmin):
     list_filter = ('date', 'category')
     prepopulated_fields = {'slug': ('title',)}
     readonly_fields = ('date',)
+
+@admin.register(PayloadSnapshot)
+class PayloadSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('key', 'version', 'stale', 'built_at')
+    readonly_fields = ('key', 'version', 'built_at')
+    exclude = ('body',)
+
+@admin.register(Tag)
+class TagAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'blog_count', 'community_count')
+    search_fields = ('name', 'slug')
+    readonly_fields = ('blog_count', 'community_count')
+
+@admin.register(CommentReaction)
+class CommentReactionAdmin(admin.ModelAdmin):
+    list_display = ('comment', 'kind', 'fingerprint', 'created_at')
+    list_filter = ('kind', 'created_at')
+    readonly_fields = ('created_at',)
+
+@admin.register(PostRollup)
+class PostRollupAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'granularity', 'period', 'category', 'count')
+    list_filter = ('kind', 'granularity', 'category')
+
+@admin.register(OutboundEmail)
+class OutboundEmailAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'attempts', 'next_attempt_at', 'created_at', 'sent_at')
+    list_filter = ('status', 'created_at')
+    search_fields = ('subject', 'dedup_key')
+    readonly_fields = ('created_at', 'sent_at', 'claim', 'last_error')
+
+class CampaignDeliveryInline(admin.TabularInline):
+    model = CampaignDelivery
+    fields = ('email', 'status', 'error', 'sent_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+
+@admin.register(NewsletterCampaign)
+class NewsletterCampaignAdmin(admin.ModelAdmin):
+    list_display = ('subject', 'status', 'sent_count', 'failed_count', 'created_at', 'finished_at')
+    list_filter = ('status',)
+    readonly_fields = ('status', 'last_subscriber_id', 'sent_count', 'failed_count', 'started_at', 'finished_at')
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ('jti', 'token_type', 'user', 'expires_at', 'revoked_at')
+    list_filter = ('token_type',)
+    search_fields = ('jti', 'user__email')
+    readonly_fields = ('revoked_at',)
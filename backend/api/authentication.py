@@ -0,0 +1,126 @@
+"""
+Stateless JWT authentication.
+
+ClaimsJWTAuthentication verifies the access token's signature and expiry
+and returns a ClaimsUser built from its claims (user_id, username, email,
+email_verified), so authorization checks need no database query. Views
+that need the User row call ``request.user.get_user()``, which is served
+from ``user_cache``, a small per-worker cache whose entries live for
+JWT_USER_CACHE_TTL seconds and are dropped when the user is saved or
+deleted in the same worker.
+
+Tokens revoked through api/revocation.py are rejected the same way as
+expired ones, without a query per request.
+
+A missing, malformed, expired or revoked token leaves the request anonymous
+rather than failing it, so public endpoints keep working for clients
+holding stale tokens; protected endpoints still answer 401.
+"""
+import copy
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.settings import api_settings
+
+from .revocation import is_revoked
+
+logger = logging.getLogger(__name__)
+
+
+class UserCache:
+    """
+    Per-process LRU of User rows with a time-to-live.
+    """
+
+    def __init__(self, ttl=None, max_size=None):
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+
+    def get_ttl(self):
+        return self.ttl if self.ttl is not None else getattr(settings, "JWT_USER_CACHE_TTL", 60)
+
+    def get_max_size(self):
+        return self.max_size or getattr(settings, "JWT_USER_CACHE_SIZE", 1000)
+
+    def get(self, user_id):
+        """
+        A private copy of the active user ``user_id``, or None.
+        """
+        key = str(user_id)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > now:
+                self._entries.move_to_end(key)
+                return copy.copy(entry[1])
+
+        user = get_user_model().objects.filter(pk=user_id, is_active=True).first()
+        if user is None:
+            self.forget(user_id)
+            return None
+        with self._lock:
+            self._entries[key] = (now + self.get_ttl(), user)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.get_max_size():
+                self._entries.popitem(last=False)
+        return copy.copy(user)
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(str(user_id), None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_cache = UserCache()
+
+
+class ClaimsUser(TokenUser):
+    """
+    Authenticated user backed by verified token claims.
+    """
+
+    @property
+    def email(self):
+        return self.token.get("email", "")
+
+    @property
+    def email_verified(self):
+        return bool(self.token.get("email_verified", False))
+
+    def get_user(self):
+        user = user_cache.get(self.id)
+        if user is None:
+            raise AuthenticationFailed("User not found or inactive", code="user_not_found")
+        return user
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    def authenticate(self, request):
+        try:
+            return super().authenticate(request)
+        except (InvalidToken, AuthenticationFailed) as exc:
+            logger.debug("Ignoring unusable bearer token: %s", exc)
+            return None
+
+    def get_validated_token(self, raw_token):
+        token = super().get_validated_token(raw_token)
+        if is_revoked(token):
+            raise InvalidToken("Token has been revoked")
+        return token
+
+    def get_user(self, validated_token):
+        if api_settings.USER_ID_CLAIM not in validated_token:
+            raise InvalidToken("Token contained no recognizable user identification")
+        return ClaimsUser(validated_token)
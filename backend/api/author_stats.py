@@ -0,0 +1,60 @@
+"""
+Per-author rollup of post counts and total views.
+
+Author.blog_count, community_count and total_views are adjusted with
+atomic F() updates when posts are created, deleted or moved to another
+author, and when buffered view counts are flushed (api/counters.py), so
+the public profile reads them instead of running count/Sum aggregates.
+"""
+from collections import defaultdict
+
+from django.db.models import F
+from django.db.models.functions import Greatest
+
+from .models import Author, Blog, Community
+
+COUNT_FIELDS = {
+    Blog: "blog_count",
+    Community: "community_count",
+}
+
+
+def adjust_author(author_id, model, posts=0, views=0):
+    if not author_id or not (posts or views):
+        return
+    count_field = COUNT_FIELDS[model]
+    Author.objects.filter(pk=author_id).update(**{
+        count_field: Greatest(F(count_field) + posts, 0),
+        "total_views": Greatest(F("total_views") + views, 0),
+    })
+
+
+def record_post_added(post):
+    adjust_author(post.author_id, type(post), posts=1, views=post.views)
+
+
+def record_post_removed(post):
+    adjust_author(post.author_id, type(post), posts=-1, views=-post.views)
+
+
+def record_author_change(post, old_author_id):
+    if old_author_id and old_author_id != post.author_id:
+        adjust_author(old_author_id, type(post), posts=-1, views=-post.views)
+        adjust_author(post.author_id, type(post), posts=1, views=post.views)
+
+
+def record_flushed_views(model, view_counts):
+    """
+    Credit flushed views ({post_id: n}) to the posts' authors.
+    """
+    authors = dict(model.objects.filter(pk__in=view_counts).values_list("pk", "author_id"))
+    grouped = defaultdict(int)
+    for pk, amount in view_counts.items():
+        if pk in authors:
+            grouped[authors[pk]] += amount
+
+    by_amount = defaultdict(list)
+    for author_id, amount in grouped.items():
+        by_amount[amount].append(author_id)
+    for amount, author_ids in by_amount.items():
+        Author.objects.filter(pk__in=author_ids).update(total_views=F("total_views") + amount)
@@ -1,6 +1,8 @@
 from django.contrib.auth.backends import ModelBackend
 from django.contrib.auth import get_user_model
 
+from .utils import normalize_email_key
+
 User = get_user_model()
 
 class EmailBackend(ModelBackend):
@@ -8,9 +10,12 @@ class EmailBackend(ModelBackend):
     Authenticate using email instead of username
     """
     def authenticate(self, request, username=None, password=None, **kwargs):
-        email = username or kwargs.get('email')
+        email = normalize_email_key(username or kwargs.get('email'))
+        if not email:
+            return None
         try:
-            user = User.objects.get(email=email)
+            # email_normalized is unique, so this is one index lookup.
+            user = User.objects.get(email_normalized=email)
             if user.check_password(password):
                 return user
         except User.DoesNotExist:
@@ -0,0 +1,305 @@
+"""
+Newsletter campaign dispatcher.
+
+``send_campaign`` walks NewsletterSubscriber in primary-key order
+(keyset, never OFFSET) and sends each subscriber their own message over
+one SMTP connection, paced to NEWSLETTER_RATE_LIMIT messages per second.
+
+The subject and bodies are rendered once per campaign with a marker in
+place of ``{{ email }}``; each recipient only costs a string replace.
+After every NEWSLETTER_BATCH_SIZE subscribers the CampaignDelivery rows
+are bulk-inserted and the campaign's checkpoint (last_subscriber_id) is
+advanced in one transaction, so a crashed run picks up from the last
+checkpoint and repeats at most one batch.
+
+A run claims the campaign for NEWSLETTER_CLAIM_TIMEOUT seconds (renewed
+at every checkpoint), so a second concurrent run is refused rather than
+sending everything twice. If the mail server cannot be reached the run
+stops before the current recipient and leaves the campaign SENDING; only
+recipients the server itself rejected are recorded as failed, and
+``retry_failed_deliveries`` sends to those again.
+"""
+import logging
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import transaction
+from django.db.models import F, Q, Value
+from django.db.models.functions import Coalesce
+from django.template import Context, Template
+from django.utils import timezone
+from django.utils.html import escape
+
+from .models import CampaignDelivery, NewsletterCampaign, NewsletterSubscriber
+from .outbox import CONNECTION_ERRORS, MailServerUnavailable, open_connection
+
+logger = logging.getLogger(__name__)
+
+RECIPIENT_MARKER = "RECIPIENTEMAIL0c5e1f"
+
+
+class RenderedCampaign:
+    def __init__(self, campaign):
+        context = {"email": RECIPIENT_MARKER, "campaign": campaign}
+        self.subject = " ".join(Template(campaign.subject).render(Context(context, autoescape=False)).split())
+        self.body = Template(campaign.body).render(Context(context, autoescape=False))
+        self.html_body = Template(campaign.html_body).render(Context(context)) if campaign.html_body else ""
+        self.from_email = campaign.from_email or settings.DEFAULT_FROM_EMAIL
+
+    def message_for(self, email, connection):
+        message = EmailMultiAlternatives(
+            self.subject.replace(RECIPIENT_MARKER, email),
+            self.body.replace(RECIPIENT_MARKER, email),
+            self.from_email,
+            [email],
+            connection=connection,
+        )
+        if self.html_body:
+            message.attach_alternative(self.html_body.replace(RECIPIENT_MARKER, escape(email)), "text/html")
+        return message
+
+
+class Pacer:
+    """
+    Spaces calls to ``wait`` at least 1/rate seconds apart.
+    """
+
+    def __init__(self, rate):
+        self.interval = 1 / rate if rate else 0
+        self.next_at = time.monotonic()
+
+    def wait(self):
+        now = time.monotonic()
+        if now < self.next_at:
+            time.sleep(self.next_at - now)
+            now = self.next_at
+        self.next_at = now + self.interval
+
+
+class CampaignInProgress(Exception):
+    pass
+
+
+def send_one(rendered, email, connection):
+    """
+    Send to one recipient. Returns an error message, or "" on success.
+
+    A lost connection is reopened and the message retried once; if that
+    fails too, MailServerUnavailable is raised and nothing is recorded
+    for this recipient.
+    """
+    try:
+        rendered.message_for(email, connection).send()
+        return ""
+    except CONNECTION_ERRORS as exc:
+        logger.warning("SMTP connection lost sending to %s: %s", email, exc)
+    except Exception as exc:
+        logger.warning("Failed to send campaign email to %s: %s", email, exc)
+        return str(exc) or exc.__class__.__name__
+
+    connection.close()
+    open_connection(connection)
+    try:
+        rendered.message_for(email, connection).send()
+    except CONNECTION_ERRORS as exc:
+        raise MailServerUnavailable(str(exc) or exc.__class__.__name__) from exc
+    except Exception as exc:
+        logger.warning("Failed to send campaign email to %s: %s", email, exc)
+        return str(exc) or exc.__class__.__name__
+    return ""
+
+
+def claim_timeout():
+    return timedelta(seconds=getattr(settings, "NEWSLETTER_CLAIM_TIMEOUT", 600))
+
+
+def claim_campaign(campaign, statuses, **changes):
+    """
+    Take the campaign for this run, or raise CampaignInProgress if another
+    run holds an unexpired claim. Returns the claim token.
+    """
+    token = uuid.uuid4().hex
+    now = timezone.now()
+    claimed = (
+        NewsletterCampaign.objects.filter(pk=campaign.pk, status__in=statuses)
+        .filter(Q(claim="") | Q(claimed_until__lt=now))
+        .update(claim=token, claimed_until=now + claim_timeout(), **changes)
+    )
+    if not claimed:
+        raise CampaignInProgress(f"Campaign {campaign.pk} is being sent by another run")
+    return token
+
+
+def checkpoint(campaign, token, **changes):
+    """
+    Apply progress under our claim and extend it; raises CampaignInProgress
+    (rolling back the caller's transaction) if the claim was lost.
+    """
+    updated = NewsletterCampaign.objects.filter(pk=campaign.pk, claim=token).update(
+        claimed_until=timezone.now() + claim_timeout(), **changes
+    )
+    if not updated:
+        raise CampaignInProgress(f"Campaign {campaign.pk} was claimed by another run")
+
+
+def release_campaign(campaign, token, **changes):
+    NewsletterCampaign.objects.filter(pk=campaign.pk, claim=token).update(
+        claim="", claimed_until=None, **changes
+    )
+
+
+def send_campaign(campaign, connection=None, batch_size=None, rate=None):
+    """
+    Send (or resume sending) ``campaign``. Returns (sent, failed) for this run.
+
+    If the mail server becomes unreachable the run stops at the last
+    recipient handled, leaving the campaign SENDING to be resumed later.
+    """
+    if campaign.status == NewsletterCampaign.SENT:
+        return 0, 0
+    batch_size = batch_size or getattr(settings, "NEWSLETTER_BATCH_SIZE", 100)
+    rate = rate if rate is not None else getattr(settings, "NEWSLETTER_RATE_LIMIT", 10)
+
+    token = claim_campaign(
+        campaign,
+        [NewsletterCampaign.DRAFT, NewsletterCampaign.SENDING],
+        status=NewsletterCampaign.SENDING,
+        started_at=Coalesce(F("started_at"), Value(timezone.now())),
+    )
+    campaign.refresh_from_db()
+    rendered = RenderedCampaign(campaign)
+    pacer = Pacer(rate)
+    last_id = campaign.last_subscriber_id
+    sent = failed = 0
+    finished = False
+
+    connection = connection or get_connection()
+    try:
+        open_connection(connection)
+        while True:
+            batch = list(
+                NewsletterSubscriber.objects.filter(pk__gt=last_id)
+                .order_by("pk").values_list("pk", "email")[:batch_size]
+            )
+            if not batch:
+                finished = True
+                break
+
+            deliveries = []
+            unavailable = None
+            for subscriber_id, email in batch:
+                pacer.wait()
+                try:
+                    error = send_one(rendered, email, connection)
+                except MailServerUnavailable as exc:
+                    unavailable = exc
+                    break
+                deliveries.append(CampaignDelivery(
+                    campaign=campaign,
+                    subscriber_id=subscriber_id,
+                    email=email,
+                    status=CampaignDelivery.FAILED if error else CampaignDelivery.SENT,
+                    error=error[:2000],
+                ))
+
+            if deliveries:
+                batch_failed = sum(1 for delivery in deliveries if delivery.status == CampaignDelivery.FAILED)
+                last_id = deliveries[-1].subscriber_id
+                with transaction.atomic():
+                    CampaignDelivery.objects.bulk_create(deliveries, ignore_conflicts=True)
+                    checkpoint(
+                        campaign,
+                        token,
+                        last_subscriber_id=last_id,
+                        sent_count=F("sent_count") + len(deliveries) - batch_failed,
+                        failed_count=F("failed_count") + batch_failed,
+                    )
+                sent += len(deliveries) - batch_failed
+                failed += batch_failed
+            if unavailable:
+                logger.warning(
+                    "Mail server unavailable, stopping campaign %s after subscriber %s: %s",
+                    campaign.pk, last_id, unavailable,
+                )
+                break
+    except MailServerUnavailable as exc:
+        logger.warning("Could not connect to the mail server for campaign %s: %s", campaign.pk, exc)
+    finally:
+        connection.close()
+        if finished:
+            release_campaign(campaign, token, status=NewsletterCampaign.SENT, finished_at=timezone.now())
+        else:
+            release_campaign(campaign, token)
+
+    campaign.refresh_from_db()
+    return sent, failed
+
+
+def retry_failed_deliveries(campaign, connection=None, batch_size=None, rate=None):
+    """
+    Resend the campaign to recipients whose delivery failed. Returns
+    (sent, failed) for this run; stops early, like send_campaign, if the
+    mail server becomes unreachable.
+    """
+    batch_size = batch_size or getattr(settings, "NEWSLETTER_BATCH_SIZE", 100)
+    rate = rate if rate is not None else getattr(settings, "NEWSLETTER_RATE_LIMIT", 10)
+    token = claim_campaign(campaign, [NewsletterCampaign.SENDING, NewsletterCampaign.SENT])
+    campaign.refresh_from_db()
+    rendered = RenderedCampaign(campaign)
+    pacer = Pacer(rate)
+    last_id = 0
+    sent = failed = 0
+
+    connection = connection or get_connection()
+    try:
+        open_connection(connection)
+        while True:
+            batch = list(
+                CampaignDelivery.objects.filter(
+                    campaign=campaign, status=CampaignDelivery.FAILED, pk__gt=last_id
+                ).order_by("pk").values_list("pk", "email")[:batch_size]
+            )
+            if not batch:
+                break
+
+            delivered = []
+            unavailable = None
+            for delivery_id, email in batch:
+                pacer.wait()
+                try:
+                    error = send_one(rendered, email, connection)
+                except MailServerUnavailable as exc:
+                    unavailable = exc
+                    break
+                last_id = delivery_id
+                if error:
+                    CampaignDelivery.objects.filter(pk=delivery_id).update(error=error[:2000])
+                    failed += 1
+                else:
+                    delivered.append(delivery_id)
+
+            with transaction.atomic():
+                CampaignDelivery.objects.filter(pk__in=delivered).update(
+                    status=CampaignDelivery.SENT, error="", sent_at=timezone.now()
+                )
+                checkpoint(
+                    campaign,
+                    token,
+                    sent_count=F("sent_count") + len(delivered),
+                    failed_count=F("failed_count") - len(delivered),
+                )
+            sent += len(delivered)
+            if unavailable:
+                logger.warning("Mail server unavailable, stopping retries for campaign %s: %s", campaign.pk, unavailable)
+                break
+    except MailServerUnavailable as exc:
+        logger.warning("Could not connect to the mail server for campaign %s: %s", campaign.pk, exc)
+    finally:
+        connection.close()
+        release_campaign(campaign, token)
+
+    campaign.refresh_from_db()
+    return sent, failed
@@ -0,0 +1,175 @@
+"""
+Loading comment threads without per-comment queries.
+
+Comments carry a materialized ``path`` and ``root`` (see Comment.save), so
+a thread, or the first N replies of many threads, comes back from one
+query ordered by path and is assembled into a tree in memory. Each node
+gets a ``thread_replies`` list that CommentSerializer.get_replies uses
+instead of querying ``obj.replies``.
+
+It also maintains the denormalized comment_count / thread_count /
+last_comment_at columns on Blog with single atomic UPDATEs, and can
+reconcile them in bulk when they drift.
+"""
+from django.conf import settings
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Window
+from django.db.models.functions import Coalesce, Greatest, RowNumber
+
+from .models import Blog, Comment
+
+
+def assemble_tree(comments):
+    """
+    Link comments (in path order) to their loaded parents.
+
+    Returns the comments whose parent is not in the list, i.e. the tops
+    of the loaded subtrees, in path order.
+    """
+    nodes = {}
+    tops = []
+    for comment in comments:
+        comment.thread_replies = []
+        nodes[comment.pk] = comment
+        parent = nodes.get(comment.parent_id)
+        if parent is not None:
+            parent.thread_replies.append(comment)
+        else:
+            tops.append(comment)
+    return tops
+
+
+def load_subtree(comment):
+    """
+    Attach all descendants of ``comment`` with a single query.
+    """
+    descendants = Comment.objects.filter(
+        root_id=comment.root_id, path__startswith=f"{comment.path}/"
+    ).order_by("path")
+    assemble_tree([comment, *descendants])
+    return comment
+
+
+def get_replies_per_thread():
+    return getattr(settings, "COMMENT_REPLIES_PER_THREAD", 20)
+
+
+def load_threads(roots, replies_per_thread=None):
+    """
+    Attach up to ``replies_per_thread`` replies (depth-first order) to each
+    top-level comment and annotate ``reply_count``/``has_more_replies``.
+
+    Costs two queries however many threads there are: one windowed query
+    for the replies and one grouped count.
+    """
+    if replies_per_thread is None:
+        replies_per_thread = get_replies_per_thread()
+    roots = list(roots)
+    root_ids = [root.pk for root in roots]
+    if not root_ids:
+        return roots
+
+    counts = dict(
+        Comment.objects.filter(root_id__in=root_ids, depth__gt=0)
+        .values_list("root_id")
+        .annotate(total=Count("id"))
+    )
+    replies = (
+        Comment.objects.filter(root_id__in=root_ids, depth__gt=0)
+        .annotate(position=Window(RowNumber(), partition_by=[F("root_id")], order_by=F("path").asc()))
+        .filter(position__lte=replies_per_thread)
+        .order_by("root_id", "path")
+    )
+
+    by_root = {root_id: [] for root_id in root_ids}
+    for reply in replies:
+        by_root[reply.root_id].append(reply)
+
+    for root in roots:
+        loaded = by_root[root.pk]
+        assemble_tree([root, *loaded])
+        root.reply_count = counts.get(root.pk, 0)
+        root.has_more_replies = root.reply_count > len(loaded)
+        root.last_reply_path = loaded[-1].path if loaded else root.path
+    return roots
+
+
+def thread_replies_page(root, after_path=None, limit=20):
+    """
+    Next ``limit`` replies of a thread in depth-first order, for "load more".
+
+    Returns the subtree tops of the page (each with its loaded replies) and
+    the path to continue after, or None on the last page.
+    """
+    queryset = Comment.objects.filter(root_id=root.pk, depth__gt=0).order_by("path")
+    if after_path:
+        queryset = queryset.filter(path__gt=after_path)
+    page = list(queryset[:limit + 1])
+    has_more = len(page) > limit
+    page = page[:limit]
+    return assemble_tree(page), (page[-1].path if has_more else None)
+
+
+def record_comment_added(comment):
+    Blog.objects.filter(pk=comment.blog_id).update(
+        comment_count=F("comment_count") + 1,
+        thread_count=F("thread_count") + (0 if comment.parent_id else 1),
+        last_comment_at=comment.created_at,
+    )
+
+
+def latest_comment_subquery():
+    return Subquery(
+        Comment.objects.filter(blog=OuterRef("pk")).order_by("-created_at").values("created_at")[:1]
+    )
+
+
+def record_comment_removed(comment):
+    Blog.objects.filter(pk=comment.blog_id).update(
+        comment_count=Greatest(F("comment_count") - 1, 0),
+        thread_count=Greatest(F("thread_count") - (0 if comment.parent_id else 1), 0),
+        last_comment_at=latest_comment_subquery(),
+    )
+
+
+def count_subquery(**filters):
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(blog=OuterRef("pk"), **filters)
+            .order_by()
+            .values("blog")
+            .annotate(total=Count("id"))
+            .values("total")[:1],
+            output_field=IntegerField(),
+        ),
+        0,
+    )
+
+
+def drifted_blogs():
+    """Blogs whose stored counters disagree with their comments."""
+    return Blog.objects.annotate(
+        actual_comments=count_subquery(),
+        actual_threads=count_subquery(parent__isnull=True),
+        actual_last=latest_comment_subquery(),
+    ).filter(
+        ~Q(comment_count=F("actual_comments"))
+        | ~Q(thread_count=F("actual_threads"))
+        | Q(last_comment_at__lt=F("actual_last"))
+        | Q(last_comment_at__gt=F("actual_last"))
+        | Q(last_comment_at__isnull=True, actual_last__isnull=False)
+        | Q(last_comment_at__isnull=False, actual_last__isnull=True)
+    )
+
+
+def reconcile_comment_counters(blog_ids=None):
+    """
+    Recompute the counters with one UPDATE. Returns the number of rows written.
+    """
+    queryset = Blog.objects.all()
+    if blog_ids is not None:
+        queryset = queryset.filter(pk__in=blog_ids)
+    return queryset.update(
+        comment_count=count_subquery(),
+        thread_count=count_subquery(parent__isnull=True),
+        last_comment_at=latest_comment_subquery(),
+    )
@@ -0,0 +1,88 @@
+"""
+Conditional GET for content endpoints.
+
+Views mixing in ConditionalGetMixin compute an ETag (and optionally a
+Last-Modified time) in ``get_validators`` and answer If-None-Match /
+If-Modified-Since with a 304 before the object is loaded or serialized.
+Detail views read one small metadata row; list views need no query at
+all, their ETag is built from the per-model versions api/response_cache.py
+bumps on every save and delete.
+
+ETags are weak: view counts and trending scores are written with
+queryset updates that do not touch ``updated_at``, so they can move
+without changing the validator.
+"""
+import hashlib
+from calendar import timegm
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date, quote_etag
+
+from .response_cache import model_versions
+
+
+def make_etag(*parts):
+    digest = hashlib.md5("|".join(str(part) for part in parts).encode()).hexdigest()
+    return "W/" + quote_etag(digest)
+
+
+def latest(*moments):
+    moments = [moment for moment in moments if moment is not None]
+    return max(moments) if moments else None
+
+
+def post_metadata(queryset, *fields):
+    """
+    pk and modification times of the single post in ``queryset``, or None.
+    ``fields`` are extra columns that change the response without
+    touching ``updated_at``.
+    """
+    return queryset.values("pk", "updated_at", "author__updated_at", *fields).first()
+
+
+def post_validators(row):
+    if row is None:
+        return None, None
+    # last_comment_at is among the extra fields of posts that show comment
+    # activity; comments are counted without touching updated_at.
+    return make_etag(*row.values()), latest(
+        row["updated_at"], row["author__updated_at"], row.get("last_comment_at")
+    )
+
+
+def list_validators(view, models):
+    """
+    ETag for a list whose content only changes when one of ``models`` is
+    saved or deleted. No Last-Modified: versions carry no time.
+    """
+    return make_etag(type(view).__name__, *model_versions(models)), None
+
+
+class ConditionalGetMixin:
+    def get_validators(self, request, *args, **kwargs):
+        """
+        Return (etag, last_modified); either may be None.
+        """
+        return None, None
+
+    def not_modified(self, request, *args, **kwargs):
+        """
+        Hook for work a 304 should still do (e.g. counting a view).
+        """
+
+    def get(self, request, *args, **kwargs):
+        etag, last_modified = self.get_validators(request, *args, **kwargs)
+        timestamp = last_modified and timegm(last_modified.utctimetuple())
+        response = None
+        if etag or timestamp:
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        elif response.status_code == 304:
+            self.not_modified(request, *args, **kwargs)
+        if response.status_code in (200, 304):
+            if etag and not response.has_header("ETag"):
+                response["ETag"] = etag
+            if timestamp and not response.has_header("Last-Modified"):
+                response["Last-Modified"] = http_date(timestamp)
+        return response
@@ -0,0 +1,135 @@
+"""
+Write-behind view counting for blog and community detail reads.
+
+Detail views used to do a read-modify-write save on every hit, which took
+SQLite's write lock on the hottest read path and lost increments under
+concurrency. ViewCounter instead collects increments in process memory and
+writes them in one transaction of atomic ``views = views + n`` updates once
+VIEW_COUNT_FLUSH_INTERVAL seconds have passed or VIEW_COUNT_FLUSH_SIZE
+views are pending, whichever comes first. A background thread per worker
+enforces the interval when no further views arrive, and anything still
+pending when the worker exits is flushed by an atexit hook. Each flush also credits the
+views to the posts' trending scores (api/trending.py) and to their
+authors' total_views (api/author_stats.py).
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+
+from .author_stats import record_flushed_views
+from .trending import VIEW_WEIGHT, score_increment
+
+logger = logging.getLogger(__name__)
+
+
+class ViewCounter:
+    def __init__(self, flush_interval=None, flush_size=None):
+        self.flush_interval = flush_interval
+        self.flush_size = flush_size
+        self._lock = threading.Lock()
+        self._pending = defaultdict(int)
+        self._pending_total = 0
+        self._last_flush = time.monotonic()
+        self._flusher_pid = None
+
+    def get_flush_interval(self):
+        if self.flush_interval is not None:
+            return self.flush_interval
+        return getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 30)
+
+    def get_flush_size(self):
+        if self.flush_size is not None:
+            return self.flush_size
+        return getattr(settings, "VIEW_COUNT_FLUSH_SIZE", 200)
+
+    def increment(self, model, pk, amount=1):
+        with self._lock:
+            self._start_flusher()
+            self._pending[(model, pk)] += amount
+            self._pending_total += amount
+            due = (
+                self._pending_total >= self.get_flush_size()
+                or time.monotonic() - self._last_flush >= self.get_flush_interval()
+            )
+        if due:
+            self.flush()
+
+    def _start_flusher(self):
+        # Called with the lock held; one thread per process (gunicorn forks).
+        if self._flusher_pid != os.getpid():
+            self._flusher_pid = os.getpid()
+            threading.Thread(target=self._flush_periodically, name="view-counter-flush", daemon=True).start()
+
+    def _flush_periodically(self):
+        while True:
+            interval = self.get_flush_interval()
+            with self._lock:
+                pending = self._pending_total
+                wait = self._last_flush + interval - time.monotonic()
+            if pending and wait <= 0:
+                try:
+                    self.flush()
+                finally:
+                    connection.close()
+                wait = interval
+            time.sleep(max(wait if pending else interval, 0.5))
+
+    def pending(self, model, pk):
+        """Views recorded for ``pk`` that are not in the database yet."""
+        with self._lock:
+            return self._pending.get((model, pk), 0)
+
+    def flush(self):
+        """
+        Write all pending increments. Returns the number of views written.
+        """
+        with self._lock:
+            batch = self._pending
+            self._pending = defaultdict(int)
+            self._pending_total = 0
+            self._last_flush = time.monotonic()
+        if not batch:
+            return 0
+
+        # One UPDATE per (model, amount) keeps the statement count small.
+        grouped = defaultdict(list)
+        per_model = defaultdict(dict)
+        for (model, pk), amount in batch.items():
+            grouped[(model, amount)].append(pk)
+            per_model[model][pk] = amount
+
+        try:
+            with transaction.atomic():
+                for (model, amount), pks in grouped.items():
+                    model.objects.filter(pk__in=pks).update(
+                        views=F("views") + amount,
+                        trending_score=score_increment(amount * VIEW_WEIGHT),
+                    )
+                for model, view_counts in per_model.items():
+                    record_flushed_views(model, view_counts)
+        except Exception:
+            logger.exception("Failed to flush %d view counts; will retry", len(batch))
+            with self._lock:
+                for key, amount in batch.items():
+                    self._pending[key] += amount
+                    self._pending_total += amount
+            return 0
+        return sum(batch.values())
+
+
+view_counter = ViewCounter()
+
+
+@atexit.register
+def _flush_on_exit():
+    try:
+        view_counter.flush()
+    except Exception:
+        logger.exception("Failed to flush view counts on shutdown")
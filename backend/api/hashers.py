@@ -0,0 +1,136 @@
+"""
+Password hashing profile and a cap on concurrent password checks.
+
+PASSWORD_HASHER_PROFILE names an entry of PASSWORD_HASHER_PROFILES: the
+hasher class new passwords are hashed with and its work factor. The
+hashers below take their work factor from the active profile, so a
+password stored under another profile (different algorithm or cost)
+fails ``must_update`` and Django's ``check_password`` rehashes it on the
+user's next successful login.
+
+Hashing is deliberately slow and CPU-bound, so running more hashes at
+once than there are cores only makes each of them slower.
+``password_check_slot`` lets at most PASSWORD_CHECK_CONCURRENCY password
+hashes run at once across all workers (fcntl locks on a shared file);
+further requests queue for a free slot, and only one still waiting after
+PASSWORD_CHECK_TIMEOUT seconds is answered 429.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework.exceptions import Throttled
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+WORK_FACTORS = ("iterations", "work_factor", "block_size", "parallelism", "maxmem")
+
+
+def active_profile():
+    return settings.PASSWORD_HASHER_PROFILES[settings.PASSWORD_HASHER_PROFILE]
+
+
+class ProfileHasherMixin:
+    """
+    Use the active profile's work factor when it selects this hasher.
+    """
+
+    def __init__(self):
+        profile = active_profile()
+        if profile["hasher"] == f"{type(self).__module__}.{type(self).__qualname__}":
+            for name in WORK_FACTORS:
+                if name in profile:
+                    setattr(self, name, profile[name])
+
+
+class PBKDF2PasswordHasher(ProfileHasherMixin, hashers.PBKDF2PasswordHasher):
+    pass
+
+
+class ScryptPasswordHasher(ProfileHasherMixin, hashers.ScryptPasswordHasher):
+    pass
+
+
+class SharedSemaphore:
+    """
+    At most ``slots`` holders across every process using ``path``.
+    """
+
+    def __init__(self, path=None, slots=None):
+        self.path = path
+        self.slots = slots
+        self._fd = None
+        self._pid = None
+        self._open_lock = threading.Lock()
+        # fcntl locks belong to the process; threads need their own.
+        self._thread_locks = {}
+
+    def get_slots(self):
+        return self.slots or getattr(settings, "PASSWORD_CHECK_CONCURRENCY", None) or os.cpu_count() or 2
+
+    def _open(self):
+        with self._open_lock:
+            if self._pid != os.getpid():
+                path = str(self.path or settings.PASSWORD_CHECK_LOCK_FILE)
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+                self._thread_locks = {}
+                self._pid = os.getpid()
+        return self._fd
+
+    def _try_slot(self, fd, slot):
+        with self._open_lock:
+            lock = self._thread_locks.setdefault(slot, threading.Lock())
+        if not lock.acquire(blocking=False):
+            return False
+        if fcntl is None:
+            return True
+        try:
+            fcntl.lockf(fd, fcntl.LOCK_EX | fcntl.LOCK_NB, 1, slot)
+        except OSError:
+            lock.release()
+            return False
+        return True
+
+    def acquire(self, timeout):
+        """
+        Returns the slot held, or None if none freed up within ``timeout``.
+        """
+        fd = self._open()
+        deadline = time.monotonic() + timeout
+        while True:
+            for slot in range(self.get_slots()):
+                if self._try_slot(fd, slot):
+                    return slot
+            if time.monotonic() >= deadline:
+                return None
+            time.sleep(0.01)
+
+    def release(self, slot):
+        if fcntl is not None:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, 1, slot)
+        self._thread_locks[slot].release()
+
+
+password_checks = SharedSemaphore()
+
+
+@contextmanager
+def password_check_slot():
+    """
+    Hold one of the shared password-hashing slots, or raise Throttled.
+    """
+    timeout = getattr(settings, "PASSWORD_CHECK_TIMEOUT", 10)
+    slot = password_checks.acquire(timeout)
+    if slot is None:
+        raise Throttled(wait=1, detail="Too many sign-in attempts in progress. Please retry shortly.")
+    try:
+        yield
+    finally:
+        password_checks.release(slot)
@@ -0,0 +1,299 @@
+"""
+Resized WebP/JPEG variants of uploaded images.
+
+Each image field has a JSON companion column (``cover_variants`` /
+``picture_variants``) holding the source file name, its width, height,
+dominant colour and BlurHash placeholder (api/placeholders.py), and a
+{format: {width: file name}} map of variants written under
+``variants/`` in default storage. Variants are rendered with Pillow at
+the IMAGE_VARIANT_WIDTHS not wider than the original, EXIF-rotated and
+with all metadata dropped.
+
+Saving a row whose image changed queues it on ``image_worker``, a
+background thread in the same process, so uploads do not wait for the
+resizing. The queue lives in memory, so every process also re-queues the
+rows still pending when it starts (backend/wsgi.py); jobs a restarted
+worker dropped are picked up by its replacement. A worker claims a row
+(``variants_claimed_at``) before building its variants, so rows pending
+in several processes are still built once; a claim left by a crashed
+worker expires after IMAGE_VARIANT_CLAIM_TIMEOUT seconds.
+``manage.py build_image_variants`` does the same sweep on demand,
+backfills placeholders for images whose variants were built before
+them, and with ``--force`` rebuilds all.
+"""
+import logging
+import os
+import queue
+import threading
+from datetime import timedelta
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from django.db.models import F, Q
+from django.utils import timezone
+from PIL import Image, ImageOps
+
+from .models import Author, Blog, Community
+from .placeholders import blurhash, dominant_color
+from .response_cache import bump_model_version
+from .utils import absolute_media_url
+
+logger = logging.getLogger(__name__)
+
+# model -> (image field, variants field)
+IMAGE_FIELDS = {
+    Blog: ("cover_image", "cover_variants"),
+    Community: ("cover_image", "cover_variants"),
+    Author: ("profile_picture", "picture_variants"),
+}
+
+# Stored with every record and served by the serializers.
+SUMMARY_KEYS = ("width", "height", "color", "placeholder")
+
+FORMATS = {
+    "webp": "WEBP",
+    "jpeg": "JPEG",
+}
+
+
+def get_variant_widths():
+    return sorted(getattr(settings, "IMAGE_VARIANT_WIDTHS", (320, 640, 1024, 1600)))
+
+
+def variant_name(source, width, fmt):
+    directory, filename = os.path.split(source)
+    stem = os.path.splitext(filename)[0]
+    return f"variants/{directory}/{stem}-{width}w.{fmt}".replace("//", "/")
+
+
+def target_widths(original_width):
+    widths = [width for width in get_variant_widths() if width <= original_width]
+    # Small originals still get one variant in each format.
+    return widths or [original_width]
+
+
+def encode(image, fmt):
+    quality = getattr(settings, "IMAGE_VARIANT_QUALITY", 80)
+    buffer = BytesIO()
+    if fmt == "jpeg":
+        if image.mode != "RGB":
+            background = Image.new("RGB", image.size, (255, 255, 255))
+            background.paste(image, mask=image.getchannel("A") if "A" in image.getbands() else None)
+            image = background
+        image.save(buffer, FORMATS[fmt], quality=quality, optimize=True, progressive=True)
+    else:
+        image.save(buffer, FORMATS[fmt], quality=quality, method=4)
+    return buffer.getvalue()
+
+
+def open_image(source):
+    with default_storage.open(source) as handle:
+        image = Image.open(handle)
+        image = ImageOps.exif_transpose(image)
+        return image.convert("RGBA" if "A" in image.getbands() or image.mode == "P" else "RGB")
+
+
+def describe(image):
+    """
+    Dimensions, dominant colour and BlurHash placeholder of an image.
+    """
+    width, height = image.size
+    return {
+        "width": width,
+        "height": height,
+        "color": dominant_color(image),
+        "placeholder": blurhash(image),
+    }
+
+
+def render_variants(source):
+    """
+    Write every variant of the stored file ``source`` and return the
+    variants record for it.
+    """
+    image = open_image(source)
+    width, height = image.size
+
+    record = {"source": source, **describe(image)}
+    for target in target_widths(width):
+        resized = image if target == width else image.resize(
+            (target, max(1, round(height * target / width))), Image.LANCZOS
+        )
+        # A fresh info dict so no EXIF/ICC/XMP is carried into the output.
+        resized.info = {}
+        for fmt in FORMATS:
+            name = variant_name(source, target, fmt)
+            if default_storage.exists(name):
+                default_storage.delete(name)
+            saved = default_storage.save(name, ContentFile(encode(resized, fmt)))
+            record.setdefault(fmt, {})[str(target)] = saved
+    return record
+
+
+def variant_files(record):
+    return [name for fmt in FORMATS for name in (record or {}).get(fmt, {}).values()]
+
+
+def delete_variant_files(record, keep=()):
+    for name in variant_files(record):
+        if name not in keep:
+            default_storage.delete(name)
+
+
+def needs_variants(instance):
+    field, variants_field = IMAGE_FIELDS[type(instance)]
+    source = getattr(instance, field).name or ""
+    return source != (getattr(instance, variants_field) or {}).get("source", "")
+
+
+def pending_images():
+    """
+    (model, pk) of every row with an image whose variants are missing or
+    were built from another file.
+    """
+    for model, (field, variants_field) in IMAGE_FIELDS.items():
+        pks = (
+            model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+            .filter(
+                Q(**{f"{variants_field}__source__isnull": True})
+                | ~Q(**{f"{variants_field}__source": F(field)})
+            )
+            .values_list("pk", flat=True)
+        )
+        for pk in pks:
+            yield model, pk
+
+
+def claim_image(model, pk):
+    """
+    Mark a row as being worked on. Returns the claim, or None if another
+    worker holds an unexpired one.
+    """
+    now = timezone.now()
+    expired = now - timedelta(seconds=getattr(settings, "IMAGE_VARIANT_CLAIM_TIMEOUT", 600))
+    claimed = (
+        model.objects.filter(pk=pk)
+        .filter(Q(variants_claimed_at__isnull=True) | Q(variants_claimed_at__lt=expired))
+        .update(variants_claimed_at=now)
+    )
+    return now if claimed else None
+
+
+def release_image(model, pk, claim):
+    model.objects.filter(pk=pk, variants_claimed_at=claim).update(variants_claimed_at=None)
+
+
+def process_image(model, pk, force=False):
+    """
+    Bring the variants of one row up to date with its image. Returns True
+    if anything was written; False if nothing was needed or another
+    worker is on it.
+    """
+    claim = claim_image(model, pk)
+    if claim is None:
+        return False
+    try:
+        while True:
+            result = update_variants(model, pk, force)
+            # None: the image was replaced meanwhile. Its own job finds the
+            # row claimed, so redo it here.
+            if result is not None:
+                return result
+            force = False
+    finally:
+        release_image(model, pk, claim)
+
+
+def update_variants(model, pk, force):
+    field, variants_field = IMAGE_FIELDS[model]
+    row = model.objects.filter(pk=pk).values_list(field, variants_field).first()
+    if row is None:
+        return False
+    source, old = row[0] or "", row[1] or {}
+    if source == old.get("source", "") and not force:
+        if not source or all(key in old for key in SUMMARY_KEYS):
+            return False
+        # Variants predate the stored summary; only add that.
+        new = {**old, **describe(open_image(source))}
+    else:
+        new = render_variants(source) if source else {}
+    updated = model.objects.filter(pk=pk, **{field: row[0]}).update(
+        **{variants_field: new, "updated_at": timezone.now()}
+    )
+    if not updated:
+        delete_variant_files(new, keep=variant_files(old))
+        return None
+    delete_variant_files(old, keep=variant_files(new))
+    # Queryset updates send no signals, so drop cached responses here.
+    bump_model_version(model)
+    return True
+
+
+def image_srcset(record):
+    """
+    {format: {width: absolute URL}} for a variants record, or None.
+    """
+    if not record or not record.get("source"):
+        return None
+    return {
+        fmt: {width: absolute_media_url(name) for width, name in record.get(fmt, {}).items()}
+        for fmt in FORMATS
+    }
+
+
+class ImageWorker:
+    """
+    Single background thread rendering variants for queued rows.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def enqueue(self, model, pk):
+        self._put((model, pk))
+
+    def requeue_pending(self):
+        """
+        Queue every row still waiting for variants; the lookup itself runs
+        on the worker thread.
+        """
+        self._put(None)
+
+    def _put(self, job):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="image-worker", daemon=True)
+                self._thread.start()
+        self._queue.put(job)
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            close_old_connections()
+            try:
+                if job is None:
+                    for pending in pending_images():
+                        self._queue.put(pending)
+                else:
+                    process_image(*job)
+            except Exception:
+                if job is None:
+                    logger.exception("Failed to re-queue pending image variants")
+                else:
+                    logger.exception("Failed to build image variants for %s %s", job[0].__name__, job[1])
+            finally:
+                self._queue.task_done()
+                if self._queue.empty():
+                    close_old_connections()
+
+    def join(self):
+        """Block until every queued row has been processed."""
+        self._queue.join()
+
+
+image_worker = ImageWorker()
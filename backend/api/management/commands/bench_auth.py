@@ -0,0 +1,61 @@
+import time
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from api.authentication import ClaimsJWTAuthentication, user_cache
+from api.serializers import CustomTokenObtainPairSerializer
+
+
+class Command(BaseCommand):
+    help = "Measure per-request authentication overhead of the JWT authentication classes"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--iterations", type=int, default=5000)
+
+    def handle(self, *args, **options):
+        iterations = options["iterations"]
+        # Work on a throwaway user; everything is rolled back at the end.
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username="bench-auth", email="bench-auth@example.invalid", password=None
+            )
+            access = str(CustomTokenObtainPairSerializer.get_token(user).access_token)
+            factory = APIRequestFactory()
+            user_cache.clear()
+
+            def claims_only(request):
+                return ClaimsJWTAuthentication().authenticate(request)
+
+            def claims_and_user(request):
+                claims_user, _ = ClaimsJWTAuthentication().authenticate(request)
+                return claims_user.get_user()
+
+            def database_lookup(request):
+                return JWTAuthentication().authenticate(request)
+
+            cases = [
+                ("claims only (ClaimsJWTAuthentication)", claims_only),
+                ("claims + cached User row", claims_and_user),
+                ("simplejwt JWTAuthentication (query per request)", database_lookup),
+            ]
+            for label, authenticate in cases:
+                requests = [
+                    Request(factory.get("/api/profile/", HTTP_AUTHORIZATION=f"Bearer {access}"))
+                    for _ in range(iterations)
+                ]
+                with CaptureQueriesContext(connection) as queries:
+                    started = time.perf_counter()
+                    for request in requests:
+                        authenticate(request)
+                    elapsed = time.perf_counter() - started
+                self.stdout.write(
+                    f"{label}: {elapsed / iterations * 1e6:.1f} µs/request, "
+                    f"{len(queries) / iterations:.3f} queries/request"
+                )
+            transaction.set_rollback(True)
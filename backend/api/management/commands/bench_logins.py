@@ -0,0 +1,57 @@
+import time
+
+from django.conf import settings
+from django.contrib.auth import authenticate, get_user_model
+from django.contrib.auth.hashers import identify_hasher
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test.utils import override_settings
+
+PASSWORD = "bench-logins-Passw0rd!"
+
+
+class Command(BaseCommand):
+    help = "Measure logins per second per worker under each password hashing profile"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--profile", action="append", dest="profiles",
+                            help="Profile to measure (repeatable); defaults to all of PASSWORD_HASHER_PROFILES")
+        parser.add_argument("--seconds", type=float, default=3, help="Time spent logging in per profile")
+
+    def handle(self, *args, **options):
+        profiles = options["profiles"] or list(settings.PASSWORD_HASHER_PROFILES)
+        unknown = set(profiles) - set(settings.PASSWORD_HASHER_PROFILES)
+        if unknown:
+            raise CommandError(f"Unknown profile(s): {', '.join(sorted(unknown))}")
+
+        # Work on a throwaway user; everything is rolled back at the end.
+        with transaction.atomic():
+            user = get_user_model().objects.create_user(
+                username="bench-logins", email="bench-logins@example.invalid", password=PASSWORD
+            )
+            for name in profiles:
+                hasher = settings.PASSWORD_HASHER_PROFILES[name]["hasher"]
+                hashers = [hasher] + [path for path in settings.PASSWORD_HASHERS if path != hasher]
+                with override_settings(PASSWORD_HASHER_PROFILE=name, PASSWORD_HASHERS=hashers):
+                    self.stdout.write(self.measure(name, user, options["seconds"]))
+            transaction.set_rollback(True)
+
+    def measure(self, name, user, seconds):
+        before = user.__class__.objects.values_list("password", flat=True).get(pk=user.pk)
+        # The first login under a new profile rehashes the stored password.
+        if authenticate(email=user.email, password=PASSWORD) is None:
+            raise CommandError("Benchmark login failed")
+        after = user.__class__.objects.values_list("password", flat=True).get(pk=user.pk)
+
+        logins = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < seconds:
+            authenticate(email=user.email, password=PASSWORD)
+            logins += 1
+        elapsed = time.perf_counter() - started
+
+        return (
+            f"{name} ({identify_hasher(after).algorithm}): {logins / elapsed:.1f} logins/s per worker, "
+            f"{elapsed / logins * 1000:.0f} ms/login"
+            + (", rehashed on first login" if after != before else "")
+        )
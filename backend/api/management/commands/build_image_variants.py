@@ -0,0 +1,30 @@
+from django.core.management.base import BaseCommand
+
+from api.images import IMAGE_FIELDS, process_image
+
+
+class Command(BaseCommand):
+    help = "Build resized WebP/JPEG variants for existing cover images and profile pictures"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Rebuild variants even for images that already have them",
+        )
+
+    def handle(self, *args, **options):
+        built = failed = 0
+        for model, (field, _) in IMAGE_FIELDS.items():
+            pks = list(
+                model.objects.exclude(**{field: ""}).exclude(**{f"{field}__isnull": True})
+                .values_list("pk", flat=True)
+            )
+            for pk in pks:
+                try:
+                    if process_image(model, pk, force=options["force"]):
+                        built += 1
+                except Exception as exc:
+                    failed += 1
+                    self.stderr.write(f"{model.__name__} {pk}: {exc}")
+        self.stdout.write(self.style.SUCCESS(f"Built variants for {built} images ({failed} failed)."))
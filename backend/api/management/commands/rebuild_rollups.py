@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from api.rollups import rebuild_rollups
+
+
+class Command(BaseCommand):
+    help = "Recompute the daily/monthly post rollups used by the dashboard"
+
+    def handle(self, *args, **options):
+        count = rebuild_rollups()
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {count} rollup rows."))
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.search import rebuild_index, search_available
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for blogs and community posts"
+
+    def handle(self, *args, **options):
+        if not search_available():
+            self.stderr.write("Full-text search needs the SQLite database backend.")
+            return
+        rebuild_index()
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
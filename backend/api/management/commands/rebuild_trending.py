@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from api.models import Blog, Community
+from api.trending import rebuild_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute trending scores for blogs and community posts"
+
+    def handle(self, *args, **options):
+        for model in (Blog, Community):
+            count = rebuild_scores(model)
+            self.stdout.write(f"{model.__name__}: {count} scores rebuilt")
+        self.stdout.write(self.style.SUCCESS("Trending scores rebuilt."))
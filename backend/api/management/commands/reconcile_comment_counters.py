@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+
+from api.comments import drifted_blogs, reconcile_comment_counters
+
+
+class Command(BaseCommand):
+    help = "Repair drift in the per-blog comment counters and last-activity timestamps"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report blogs whose counters have drifted",
+        )
+
+    def handle(self, *args, **options):
+        drifted = list(drifted_blogs().values_list("id", flat=True))
+        self.stdout.write(f"{len(drifted)} blog(s) with drifted comment counters")
+        if options["dry_run"] or not drifted:
+            return
+        updated = reconcile_comment_counters(drifted)
+        self.stdout.write(self.style.SUCCESS(f"Reconciled {updated} blog(s)."))
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from api.campaigns import CampaignInProgress, retry_failed_deliveries, send_campaign
+from api.models import NewsletterCampaign
+
+
+class Command(BaseCommand):
+    help = "Send a newsletter campaign to every subscriber, resuming from its last checkpoint"
+
+    def add_arguments(self, parser):
+        parser.add_argument("campaign_id", type=int)
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Subscribers per checkpoint (default: NEWSLETTER_BATCH_SIZE)",
+        )
+        parser.add_argument(
+            "--rate",
+            type=float,
+            default=None,
+            help="Messages per second (default: NEWSLETTER_RATE_LIMIT, 0 for no limit)",
+        )
+        parser.add_argument(
+            "--retry-failed",
+            action="store_true",
+            help="Resend to recipients whose delivery failed instead of continuing the campaign",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            campaign = NewsletterCampaign.objects.get(pk=options["campaign_id"])
+        except NewsletterCampaign.DoesNotExist:
+            raise CommandError(f"Campaign {options['campaign_id']} does not exist")
+
+        try:
+            if options["retry_failed"]:
+                sent, failed = retry_failed_deliveries(
+                    campaign, batch_size=options["batch_size"], rate=options["rate"]
+                )
+            else:
+                if campaign.status == NewsletterCampaign.SENT:
+                    self.stdout.write(f"Campaign {campaign.pk} was already sent.")
+                    return
+                if campaign.last_subscriber_id:
+                    self.stdout.write(f"Resuming after subscriber {campaign.last_subscriber_id}.")
+                sent, failed = send_campaign(campaign, batch_size=options["batch_size"], rate=options["rate"])
+        except CampaignInProgress as e:
+            raise CommandError(str(e))
+
+        summary = (
+            f"Campaign {campaign.pk}: sent {sent}, failed {failed} "
+            f"(totals: {campaign.sent_count} sent, {campaign.failed_count} failed)."
+        )
+        if campaign.status == NewsletterCampaign.SENDING and not options["retry_failed"]:
+            self.stdout.write(self.style.WARNING(
+                f"{summary} Stopped after subscriber {campaign.last_subscriber_id}: "
+                "the mail server was unreachable. Run again to resume."
+            ))
+        else:
+            self.stdout.write(self.style.SUCCESS(summary))
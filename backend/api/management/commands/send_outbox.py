@@ -0,0 +1,33 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from api.outbox import drain
+
+
+class Command(BaseCommand):
+    help = "Deliver queued emails from the outbox, polling for new ones until stopped"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Send what is due now and exit",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=None,
+            help="Messages claimed per batch (default: OUTBOX_BATCH_SIZE)",
+        )
+
+    def handle(self, *args, **options):
+        interval = getattr(settings, "OUTBOX_POLL_INTERVAL", 5)
+        while True:
+            sent, failed = drain(batch_size=options["batch_size"])
+            if sent or failed:
+                self.stdout.write(f"Sent {sent} email(s), {failed} failed.")
+            if options["once"]:
+                break
+            time.sleep(interval)
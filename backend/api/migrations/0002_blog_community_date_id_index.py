@@ -0,0 +1,21 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:13
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-date', '-id'], name='blog_date_id_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['-date', '-id'], name='community_date_id_idx'),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0002_blog_community_date_id_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PayloadSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.CharField(max_length=50, unique=True)),
+                ('version', models.PositiveIntegerField(default=0)),
+                ('body', models.BinaryField()),
+                ('stale', models.BooleanField(default=False)),
+                ('built_at', models.DateTimeField()),
+            ],
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_payloadsnapshot'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Tag',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100)),
+                ('key', models.CharField(editable=False, max_length=100, unique=True)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('blog_count', models.PositiveIntegerField(default=0)),
+                ('community_count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='blogs', to='api.tag'),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='tag_set',
+            field=models.ManyToManyField(blank=True, editable=False, related_name='community', to='api.tag'),
+        ),
+    ]
@@ -0,0 +1,62 @@
+from django.db import migrations
+from django.utils.text import slugify
+
+SLUG_SYMBOLS = {'+': ' plus ', '#': ' sharp ', '&': ' and ', '@': ' at ', '.': ' dot '}
+
+
+def tag_slug(name, taken):
+    for symbol, word in SLUG_SYMBOLS.items():
+        name = name.replace(symbol, word)
+    base = slugify(name)[:100].strip('-') or 'tag'
+    slug, number = base, 1
+    while slug in taken:
+        number += 1
+        suffix = f'-{number}'
+        slug = base[:100 - len(suffix)].rstrip('-') + suffix
+    taken.add(slug)
+    return slug
+
+
+def split_tags(apps, schema_editor):
+    """
+    Split the existing comma-separated tag strings into Tag rows and links.
+    """
+    Tag = apps.get_model('api', 'Tag')
+    tag_ids = {}
+    slugs = set()
+
+    for model_name, count_field in (('Blog', 'blog_count'), ('Community', 'community_count')):
+        model = apps.get_model('api', model_name)
+        Through = model.tag_set.through
+        fk_name = f'{model_name.lower()}_id'
+        counts = {}
+        links = []
+
+        for pk, raw in model.objects.values_list('id', 'tags'):
+            seen = set()
+            for name in (raw or '').split(','):
+                name = ' '.join(name.split())[:100]
+                key = name.casefold()[:100]
+                if not key or key in seen:
+                    continue
+                seen.add(key)
+                if key not in tag_ids:
+                    tag_ids[key] = Tag.objects.create(key=key, name=name, slug=tag_slug(name, slugs)).id
+                tag_id = tag_ids[key]
+                links.append(Through(**{fk_name: pk, 'tag_id': tag_id}))
+                counts[tag_id] = counts.get(tag_id, 0) + 1
+
+        Through.objects.bulk_create(links, ignore_conflicts=True)
+        for tag_id, count in counts.items():
+            Tag.objects.filter(id=tag_id).update(**{count_field: count})
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_tag'),
+    ]
+
+    operations = [
+        migrations.RunPython(split_tags, migrations.RunPython.noop),
+    ]
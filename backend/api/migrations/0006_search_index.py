@@ -0,0 +1,51 @@
+from django.db import migrations
+
+CREATE_INDEX = """
+CREATE VIRTUAL TABLE IF NOT EXISTS api_search_index USING fts5(
+    kind UNINDEXED,
+    post_id UNINDEXED,
+    slug UNINDEXED,
+    title,
+    description,
+    content,
+    tags,
+    tokenize = 'porter unicode61 remove_diacritics 2'
+)
+"""
+
+# Weight title and tags above body text; kind/post_id/slug are not ranked.
+SET_RANK = """
+INSERT INTO api_search_index(api_search_index, rank)
+VALUES ('rank', 'bm25(0.0, 0.0, 0.0, 10.0, 4.0, 1.0, 6.0)')
+"""
+
+POPULATE = """
+INSERT INTO api_search_index(rowid, kind, post_id, slug, title, description, content, tags)
+SELECT id * 2, 'blog', id, slug, title, description, content, tags FROM api_blog
+UNION ALL
+SELECT id * 2 + 1, 'community', id, slug, title, description, content, tags FROM api_community
+"""
+
+
+def create_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    for statement in (CREATE_INDEX, SET_RANK, POPULATE):
+        schema_editor.execute(statement)
+
+
+def drop_search_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute("DROP TABLE IF EXISTS api_search_index")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_split_existing_tags'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_index, drop_search_index),
+    ]
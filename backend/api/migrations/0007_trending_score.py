@@ -0,0 +1,64 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:17
+
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def seed_trending_scores(apps, schema_editor):
+    """
+    Initial scores from all-time totals, credited at publication time
+    (same formula as api.trending.rebuild_scores).
+    """
+    epoch = datetime(2025, 1, 1, tzinfo=timezone.utc)
+    half_life = getattr(settings, 'TRENDING_HALF_LIFE_HOURS', 72) * 3600
+    for model_name in ('Blog', 'Community'):
+        model = apps.get_model('api', model_name)
+        queryset = model.objects.all()
+        if model_name == 'Blog':
+            queryset = queryset.annotate(comment_total=Count('comments'))
+        posts = list(queryset)
+        for post in posts:
+            weight = 20.0 + post.views * 1.0 + getattr(post, 'comment_total', 0) * 5.0
+            post.trending_score = math.log2(weight) + (post.date - epoch).total_seconds() / half_life
+        model.objects.bulk_update(posts, ['trending_score'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_search_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='trending_score',
+            field=models.FloatField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-trending_score'], name='blog_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['category', '-trending_score'], name='blog_cat_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['-trending_score'], name='community_trending_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='community',
+            index=models.Index(fields=['category', '-trending_score'], name='community_cat_trending_idx'),
+        ),
+        migrations.RunPython(seed_trending_scores, migrations.RunPython.noop),
+    ]
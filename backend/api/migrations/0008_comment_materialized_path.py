@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:18
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    """
+    Fill path/depth/root for existing comments; parents always have lower ids.
+    """
+    Comment = apps.get_model('api', 'Comment')
+    positions = {}
+    comments = list(Comment.objects.order_by('id').only('id', 'parent_id'))
+    for comment in comments:
+        segment = f"{comment.id:010d}"
+        parent = positions.get(comment.parent_id)
+        if parent:
+            comment.path = f"{parent[0]}/{segment}"
+            comment.depth = parent[1] + 1
+            comment.root_id = parent[2]
+        else:
+            comment.path, comment.depth, comment.root_id = segment, 0, comment.id
+        positions[comment.id] = (comment.path, comment.depth, comment.root_id)
+    Comment.objects.bulk_update(comments, ['path', 'depth', 'root'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_trending_score'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='depth',
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='path',
+            field=models.CharField(blank=True, editable=False, max_length=255),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='root',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='thread', to='api.comment'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['root', 'path'], name='comment_thread_path_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['blog', 'depth', '-created_at', '-id'], name='comment_blog_roots_idx'),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
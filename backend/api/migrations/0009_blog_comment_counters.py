@@ -0,0 +1,58 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:20
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Blog = apps.get_model('api', 'Blog')
+    Comment = apps.get_model('api', 'Comment')
+
+    def count(**filters):
+        return Coalesce(
+            Subquery(
+                Comment.objects.filter(blog=OuterRef('pk'), **filters)
+                .order_by().values('blog').annotate(total=Count('id')).values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    Blog.objects.update(
+        comment_count=count(),
+        thread_count=count(parent__isnull=True),
+        last_comment_at=Subquery(
+            Comment.objects.filter(blog=OuterRef('pk')).order_by('-created_at').values('created_at')[:1]
+        ),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_comment_materialized_path'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blog',
+            name='comment_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='last_comment_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='thread_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='blog',
+            index=models.Index(fields=['-last_comment_at', '-id'], name='blog_activity_idx'),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
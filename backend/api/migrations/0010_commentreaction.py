@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:21
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_blog_comment_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CommentReaction',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('kind', models.CharField(choices=[('like', 'Like'), ('dislike', 'Dislike')], max_length=10)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('comment', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='reactions', to='api.comment')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('comment', 'fingerprint'), name='unique_reaction_per_client')],
+            },
+        ),
+    ]
@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:21
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery, Sum
+from django.db.models.functions import Coalesce
+
+
+def backfill_author_stats(apps, schema_editor):
+    Author = apps.get_model('api', 'Author')
+
+    def rollup(model_name, aggregate):
+        model = apps.get_model('api', model_name)
+        return Coalesce(
+            Subquery(
+                model.objects.filter(author=OuterRef('pk'))
+                .order_by().values('author').annotate(total=aggregate).values('total')[:1],
+                output_field=IntegerField(),
+            ),
+            0,
+        )
+
+    Author.objects.update(
+        blog_count=rollup('Blog', Count('id')),
+        community_count=rollup('Community', Count('id')),
+        total_views=rollup('Blog', Sum('views')) + rollup('Community', Sum('views')),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_commentreaction'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='blog_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='community_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='total_views',
+            field=models.PositiveBigIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(backfill_author_stats, migrations.RunPython.noop),
+    ]
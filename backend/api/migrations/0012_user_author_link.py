@@ -0,0 +1,48 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:22
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models.functions import Lower, Trim
+
+
+def link_users_and_authors(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    Author = apps.get_model('api', 'Author')
+    User.objects.update(email_normalized=Lower(Trim('email')))
+    Author.objects.update(email_normalized=Lower(Trim('email')))
+
+    # When several users share an email, link the earliest account.
+    users = {}
+    for user_id, email in User.objects.exclude(email_normalized='').order_by('-id').values_list('id', 'email_normalized'):
+        users[email] = user_id
+    for author in Author.objects.filter(user__isnull=True).only('id', 'email_normalized'):
+        user_id = users.get(author.email_normalized)
+        if user_id:
+            Author.objects.filter(pk=author.pk).update(user_id=user_id)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_author_stats'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.AddField(
+            model_name='author',
+            name='user',
+            field=models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='author', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=254),
+        ),
+        migrations.RunPython(link_users_and_authors, migrations.RunPython.noop),
+    ]
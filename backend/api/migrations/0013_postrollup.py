@@ -0,0 +1,52 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:23
+
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import TruncDay, TruncMonth
+from django.utils import timezone
+
+
+def seed_rollups(apps, schema_editor):
+    PostRollup = apps.get_model('api', 'PostRollup')
+    rows = []
+    for model_name, kind in (('Blog', 'blog'), ('Community', 'community')):
+        model = apps.get_model('api', model_name)
+        for granularity, trunc in (('day', TruncDay), ('month', TruncMonth)):
+            grouped = (
+                model.objects.annotate(period=trunc('date'))
+                .values('period', 'category').annotate(total=Count('id')).order_by()
+            )
+            rows.extend(
+                PostRollup(
+                    kind=kind, granularity=granularity,
+                    period=timezone.localtime(entry['period']).date(),
+                    category=entry['category'], count=entry['total'],
+                )
+                for entry in grouped
+            )
+    PostRollup.objects.bulk_create(rows, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_user_author_link'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PostRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(max_length=20)),
+                ('granularity', models.CharField(choices=[('day', 'Day'), ('month', 'Month')], max_length=5)),
+                ('period', models.DateField()),
+                ('category', models.CharField(max_length=100)),
+                ('count', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('kind', 'granularity', 'period', 'category'), name='unique_post_rollup_bucket')],
+            },
+        ),
+        migrations.RunPython(seed_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:27
+
+from django.db import migrations, models
+from django.db.models import F
+
+
+def backfill_updated_at(apps, schema_editor):
+    # Existing posts were last modified no earlier than they were published.
+    for model_name in ('Blog', 'Community'):
+        apps.get_model('api', model_name).objects.update(updated_at=F('date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0013_postrollup'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='updated_at',
+            field=models.DateTimeField(auto_now=True, db_index=True),
+        ),
+        migrations.RunPython(backfill_updated_at, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:41
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower, Trim
+
+
+def normalize_emails(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    User.objects.update(email_normalized=Lower(Trim('email')))
+    User.objects.filter(email_normalized='').update(email_normalized=None)
+
+    # Accounts sharing an address must be resolved by hand: clearing the
+    # key on some of them would only make their next save() fail.
+    duplicates = (
+        User.objects.exclude(email_normalized=None)
+        .values('email_normalized')
+        .annotate(accounts=Count('id'))
+        .filter(accounts__gt=1)
+        .order_by('email_normalized')
+    )
+    conflicts = [
+        (row['email_normalized'], list(
+            User.objects.filter(email_normalized=row['email_normalized']).order_by('id').values_list('id', flat=True)
+        ))
+        for row in duplicates
+    ]
+    if conflicts:
+        listing = '\n'.join(f'  {email}: user ids {ids}' for email, ids in conflicts)
+        raise RuntimeError(
+            'Several accounts share an email address (ignoring case). Merge them or '
+            'change the email of all but one, then run migrate again:\n' + listing
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_revoked_tokens'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True),
+        ),
+        migrations.RunPython(normalize_emails, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='user',
+            name='email_normalized',
+            field=models.CharField(blank=True, editable=False, max_length=254, null=True, unique=True),
+        ),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(django.db.models.functions.text.Lower('username'), name='user_username_lower_idx'),
+        ),
+    ]
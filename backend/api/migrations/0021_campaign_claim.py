@@ -0,0 +1,23 @@
+# Generated by Django 5.2.18 on 2026-10-18 01:51
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_unique_user_email'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='newslettercampaign',
+            name='claim',
+            field=models.CharField(blank=True, editable=False, max_length=32),
+        ),
+        migrations.AddField(
+            model_name='newslettercampaign',
+            name='claimed_until',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.18 on 2026-10-18 02:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_campaign_claim'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='author',
+            name='variants_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='blog',
+            name='variants_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='community',
+            name='variants_claimed_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True),
+        ),
+    ]
@@ -2,14 +2,17 @@ from django.db import models
 from django.contrib.auth.models import AbstractUser
 from django.core.validators import FileExtensionValidator
 from django.conf import settings
-from django.core.mail import send_mail
 from django.template.loader import render_to_string
 from django.utils.http import urlsafe_base64_encode
 from django.utils.encoding import force_bytes
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.text import slugify
+from django.utils import timezone
+from django.db.models.functions import Lower
 import datetime
 
+from .utils import normalize_email_key, normalize_tag_key
+
 
 class User(AbstractUser):
     groups = models.ManyToManyField(
@@ -28,9 +31,18 @@ class User(AbstractUser):
     )
 
     email_verified = models.BooleanField(default=False)
+    # Lowercased copy of email for indexed case-insensitive lookups; one
+    # account per address. NULL when the user has no email.
+    email_normalized = models.CharField(max_length=254, unique=True, null=True, blank=True, editable=False)
+
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            models.Index(Lower('username'), name='user_username_lower_idx'),
+        ]
     
     def save(self, *args, **kwargs):
         created = not self.pk
+        self.email_normalized = normalize_email_key(self.email) or None
         super().save(*args, **kwargs)
         if created and not self.email_verified:
             self.send_verification_email()
@@ -49,23 +61,40 @@ class User(AbstractUser):
             'year': datetime.datetime.now().year,
         })
         plain_message = f"Hi {self.username},\nPlease verify your email: {verification_url}"
-        
-        send_mail(
+
+        # Delivered by the outbox worker; a second call before then is a no-op.
+        from .outbox import enqueue_email
+        enqueue_email(
             subject,
             plain_message,
-            settings.DEFAULT_FROM_EMAIL,
             [self.email],
-            html_message=html_message,
-            fail_silently=False,
+            html_body=html_message,
+            dedup_key=f"verify-email:{self.pk}",
         )
-    pass
 
 
 class Author(models.Model):
     name = models.CharField(max_length=255)
     email = models.EmailField(unique=True)
+    email_normalized = models.CharField(max_length=254, blank=True, db_index=True, editable=False)
+    user = models.OneToOneField(
+        User, on_delete=models.SET_NULL, null=True, blank=True, related_name='author'
+    )
     bio = models.TextField(blank=True)
     profile_picture = models.ImageField(upload_to='authors/', blank=True, null=True)
+    # Resized variants of profile_picture, built by api/images.py.
+    picture_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Set while a worker builds the variants, so no other one does too.
+    variants_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
+    # Rollup of the author's posts, kept current by api/author_stats.py.
+    blog_count = models.PositiveIntegerField(default=0, editable=False)
+    community_count = models.PositiveIntegerField(default=0, editable=False)
+    total_views = models.PositiveBigIntegerField(default=0, editable=False)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.email_normalized = normalize_email_key(self.email)
+        super().save(*args, **kwargs)
 
     def __str__(self):
         return self.name
@@ -87,17 +116,65 @@ class ContactMessage(models.Model):
     def __str__(self):
         return f"Message from {self.name}"
     
+class Tag(models.Model):
+    """
+    A single tag split out of the comma-separated ``tags`` strings on
+    Blog/Community, with per-model post counts kept up to date by
+    api/tags.py.
+    """
+    name = models.CharField(max_length=100)
+    # Tags are told apart by this, not by the slug: "C", "C#" and "C++"
+    # would all slugify to "c".
+    key = models.CharField(max_length=100, unique=True, editable=False)
+    slug = models.SlugField(max_length=100, unique=True)
+    blog_count = models.PositiveIntegerField(default=0)
+    community_count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        ordering = ['name']
+
+    def save(self, *args, **kwargs):
+        self.key = normalize_tag_key(self.name)
+        super().save(*args, **kwargs)
+
+    def __str__(self):
+        return self.name
+
+
 class Blog(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     content = models.TextField()
     cover_image = models.ImageField(upload_to='blogs/', blank=True, null=True)
+    # Resized variants of cover_image, built by api/images.py.
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Set while a worker builds the variants, so no other one does too.
+    variants_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='blogs')
     date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     category = models.CharField(max_length=100)
     tags = models.CharField(max_length=255)
+    tag_set = models.ManyToManyField('Tag', related_name='blogs', blank=True, editable=False)
     slug = models.SlugField(unique=True, blank=True)
     views = models.PositiveIntegerField(default=0)
+    # Time-decayed popularity, see api/trending.py.
+    trending_score = models.FloatField(default=0, editable=False)
+    # Denormalized comment activity, kept current by api/comments.py.
+    comment_count = models.PositiveIntegerField(default=0, editable=False)
+    thread_count = models.PositiveIntegerField(default=0, editable=False)
+    last_comment_at = models.DateTimeField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination on (date, id).
+            models.Index(fields=['-date', '-id'], name='%(class)s_date_id_idx'),
+            # Top-K trending reads, overall and per category.
+            models.Index(fields=['-trending_score'], name='%(class)s_trending_idx'),
+            models.Index(fields=['category', '-trending_score'], name='%(class)s_cat_trending_idx'),
+            # Most recently discussed first.
+            models.Index(fields=['-last_comment_at', '-id'], name='blog_activity_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -108,33 +185,107 @@ class Blog(models.Model):
         return self.title
     
 class Comment(models.Model):
+    # Each path segment is the zero-padded id of one ancestor, so ordering a
+    # thread by path gives depth-first, oldest-first order.
+    PATH_SEGMENT_WIDTH = 10
+    MAX_DEPTH = 20
+
     name = models.CharField(max_length=100)
     email = models.EmailField(blank=True, null=True)
     message = models.TextField()
     blog = models.ForeignKey('Blog', on_delete=models.CASCADE, related_name='comments')
     parent = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='replies')
+    # Materialized thread position, filled in on first save.
+    root = models.ForeignKey('self', on_delete=models.CASCADE, null=True, blank=True, related_name='thread', editable=False)
+    path = models.CharField(max_length=255, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     likes = models.PositiveIntegerField(default=0)
     dislikes = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # Whole thread in one ordered range scan.
+            models.Index(fields=['root', 'path'], name='comment_thread_path_idx'),
+            # Top-level comments of a post, newest first.
+            models.Index(fields=['blog', 'depth', '-created_at', '-id'], name='comment_blog_roots_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        if not self.path:
+            self.set_thread_position()
+
+    def set_thread_position(self):
+        segment = f"{self.pk:0{self.PATH_SEGMENT_WIDTH}d}"
+        if self.parent_id:
+            parent = Comment.objects.only('path', 'depth', 'root_id').get(pk=self.parent_id)
+            self.path = f"{parent.path}/{segment}"
+            self.depth = parent.depth + 1
+            self.root_id = parent.root_id
+        else:
+            self.path = segment
+            self.depth = 0
+            self.root_id = self.pk
+        Comment.objects.filter(pk=self.pk).update(path=self.path, depth=self.depth, root_id=self.root_id)
+
     def __str__(self):
         if self.parent:
             return f"Reply by {self.name} to {self.parent.name}"
         return f"Comment by {self.name} on {self.blog.title}"
 
 
+class CommentReaction(models.Model):
+    """
+    One like or dislike per client fingerprint per comment (see api/reactions.py).
+    """
+    LIKE = 'like'
+    DISLIKE = 'dislike'
+    KIND_CHOICES = [(LIKE, 'Like'), (DISLIKE, 'Dislike')]
+
+    comment = models.ForeignKey(Comment, on_delete=models.CASCADE, related_name='reactions')
+    fingerprint = models.CharField(max_length=64)
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['comment', 'fingerprint'], name='unique_reaction_per_client'),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} on comment {self.comment_id}"
+
+
    
 class Community(models.Model):
     title = models.CharField(max_length=255)
     description = models.TextField()
     content = models.TextField()
     cover_image = models.ImageField(upload_to='community/', blank=True, null=True)
+    # Resized variants of cover_image, built by api/images.py.
+    cover_variants = models.JSONField(default=dict, blank=True, editable=False)
+    # Set while a worker builds the variants, so no other one does too.
+    variants_claimed_at = models.DateTimeField(null=True, blank=True, editable=False)
     author = models.ForeignKey(Author, on_delete=models.CASCADE, related_name='community')
     date = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     category = models.CharField(max_length=100)
     tags = models.CharField(max_length=255)
+    tag_set = models.ManyToManyField('Tag', related_name='community', blank=True, editable=False)
     slug = models.SlugField(unique=True, blank=True)
     views = models.PositiveIntegerField(default=0)
+    # Time-decayed popularity, see api/trending.py.
+    trending_score = models.FloatField(default=0, editable=False)
+
+    class Meta:
+        indexes = [
+            # Backs keyset pagination on (date, id).
+            models.Index(fields=['-date', '-id'], name='%(class)s_date_id_idx'),
+            # Top-K trending reads, overall and per category.
+            models.Index(fields=['-trending_score'], name='%(class)s_trending_idx'),
+            models.Index(fields=['category', '-trending_score'], name='%(class)s_cat_trending_idx'),
+        ]
 
     def save(self, *args, **kwargs):
         if not self.slug:
@@ -143,3 +294,163 @@ class Community(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class PayloadSnapshot(models.Model):
+    """
+    A pre-rendered JSON payload for a read-mostly endpoint (see api/snapshots.py).
+    """
+    key = models.CharField(max_length=50, unique=True)
+    version = models.PositiveIntegerField(default=0)
+    body = models.BinaryField()
+    stale = models.BooleanField(default=False)
+    built_at = models.DateTimeField()
+
+    @property
+    def etag(self):
+        return f'"{self.key}-{self.version}"'
+
+    def __str__(self):
+        return f"{self.key} v{self.version}"
+
+
+class PostRollup(models.Model):
+    """
+    Number of posts of one kind and category created in a day or month,
+    maintained incrementally by api/rollups.py for the dashboard.
+    """
+    DAY = 'day'
+    MONTH = 'month'
+    GRANULARITY_CHOICES = [(DAY, 'Day'), (MONTH, 'Month')]
+
+    kind = models.CharField(max_length=20)
+    granularity = models.CharField(max_length=5, choices=GRANULARITY_CHOICES)
+    period = models.DateField()
+    category = models.CharField(max_length=100)
+    count = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['kind', 'granularity', 'period', 'category'], name='unique_post_rollup_bucket'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} {self.granularity} {self.period} {self.category}: {self.count}"
+
+
+class OutboundEmail(models.Model):
+    """
+    A rendered email waiting to be delivered by ``manage.py send_outbox``
+    (see api/outbox.py).
+    """
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(PENDING, 'Pending'), (SENDING, 'Sending'), (SENT, 'Sent'), (FAILED, 'Failed')]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255)
+    to = models.JSONField(default=list)
+    # Enqueuing again while a message with the same key is undelivered is a no-op.
+    dedup_key = models.CharField(max_length=255, blank=True, null=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    claim = models.CharField(max_length=32, blank=True)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at'], name='outbox_due_idx'),
+            models.Index(fields=['claim'], name='outbox_claim_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['dedup_key'],
+                condition=models.Q(status__in=['pending', 'sending']),
+                name='unique_undelivered_dedup_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.subject} -> {', '.join(self.to)} ({self.status})"
+
+
+class NewsletterCampaign(models.Model):
+    """
+    A mailing to every NewsletterSubscriber, sent by ``manage.py
+    send_campaign`` (see api/campaigns.py). ``last_subscriber_id`` is the
+    checkpoint a resumed run continues from.
+
+    The subject and bodies are Django templates; ``{{ email }}`` is
+    substituted per recipient. A run holds ``claim`` until
+    ``claimed_until`` so two runs never send the same campaign at once.
+    """
+    DRAFT = 'draft'
+    SENDING = 'sending'
+    SENT = 'sent'
+    STATUS_CHOICES = [(DRAFT, 'Draft'), (SENDING, 'Sending'), (SENT, 'Sent')]
+
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    html_body = models.TextField(blank=True)
+    from_email = models.CharField(max_length=255, blank=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=DRAFT)
+    last_subscriber_id = models.PositiveBigIntegerField(default=0, editable=False)
+    sent_count = models.PositiveIntegerField(default=0, editable=False)
+    failed_count = models.PositiveIntegerField(default=0, editable=False)
+    created_at = models.DateTimeField(auto_now_add=True)
+    started_at = models.DateTimeField(null=True, blank=True, editable=False)
+    finished_at = models.DateTimeField(null=True, blank=True, editable=False)
+    claim = models.CharField(max_length=32, blank=True, editable=False)
+    claimed_until = models.DateTimeField(null=True, blank=True, editable=False)
+
+    def __str__(self):
+        return self.subject
+
+
+class CampaignDelivery(models.Model):
+    """
+    Outcome of sending one campaign to one subscriber.
+    """
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [(SENT, 'Sent'), (FAILED, 'Failed')]
+
+    campaign = models.ForeignKey(NewsletterCampaign, on_delete=models.CASCADE, related_name='deliveries')
+    subscriber = models.ForeignKey(NewsletterSubscriber, on_delete=models.SET_NULL, null=True, related_name='deliveries')
+    email = models.EmailField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES)
+    error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['campaign', 'subscriber'], name='unique_campaign_delivery'),
+        ]
+
+    def __str__(self):
+        return f"{self.campaign} -> {self.email} ({self.status})"
+
+
+class RevokedToken(models.Model):
+    """
+    A JWT (access or refresh) that must no longer be accepted, identified
+    by its ``jti`` claim. Rows are only needed until the token would have
+    expired anyway (see api/revocation.py).
+    """
+    jti = models.CharField(max_length=255, unique=True)
+    token_type = models.CharField(max_length=20)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, related_name='revoked_tokens')
+    expires_at = models.DateTimeField(db_index=True)
+    revoked_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.token_type} {self.jti}"
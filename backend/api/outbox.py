@@ -0,0 +1,220 @@
+"""
+Database-backed email outbox.
+
+Requests call ``enqueue_email`` to store a fully rendered message as an
+OutboundEmail row in their own transaction, instead of talking to SMTP
+while a gunicorn worker waits. ``manage.py send_outbox`` drains the table
+over one reused connection, OUTBOX_BATCH_SIZE messages at a time.
+
+A message the server rejects is retried after OUTBOX_RETRY_DELAY
+seconds, doubling per attempt, and marked failed after
+OUTBOX_MAX_ATTEMPTS. When the server cannot be reached at all (after one
+reconnect) the run stops and the unsent messages are put back for
+OUTBOX_RETRY_DELAY seconds without using up an attempt, so an outage
+never fails mail by itself. Rows are claimed with a random token before
+sending and each is marked sent as soon as the server accepts it; a
+claim left behind by a crashed worker expires after OUTBOX_CLAIM_TIMEOUT
+seconds, so a crash repeats at most the message in flight. Messages
+enqueued with a ``dedup_key`` that is still pending are dropped.
+"""
+import logging
+import smtplib
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.forms import PasswordResetForm
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.db import IntegrityError, transaction
+from django.db.models import Q
+from django.template import loader
+from django.utils import timezone
+
+from .models import OutboundEmail
+from .utils import normalize_email_key
+
+logger = logging.getLogger(__name__)
+
+# Errors after which the connection is not worth reusing.
+CONNECTION_ERRORS = (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError)
+
+
+class MailServerUnavailable(Exception):
+    pass
+
+
+def open_connection(connection):
+    try:
+        connection.open()
+    except Exception as exc:
+        raise MailServerUnavailable(str(exc) or exc.__class__.__name__) from exc
+
+
+def enqueue_email(subject, body, to, html_body="", from_email=None, dedup_key=None):
+    """
+    Store a message for the outbox worker. Returns the OutboundEmail, or
+    the undelivered one already queued under ``dedup_key``.
+    """
+    if isinstance(to, str):
+        to = [to]
+    fields = dict(
+        subject=subject,
+        body=body,
+        html_body=html_body or "",
+        from_email=from_email or settings.DEFAULT_FROM_EMAIL,
+        to=list(to),
+    )
+    if not dedup_key:
+        return OutboundEmail.objects.create(**fields)
+    try:
+        with transaction.atomic():
+            return OutboundEmail.objects.create(dedup_key=dedup_key, **fields)
+    except IntegrityError:
+        return OutboundEmail.objects.filter(
+            dedup_key=dedup_key, status__in=[OutboundEmail.PENDING, OutboundEmail.SENDING]
+        ).first()
+
+
+class OutboxPasswordResetForm(PasswordResetForm):
+    """
+    PasswordResetForm that queues its emails instead of sending them.
+    """
+
+    def get_users(self, email):
+        # The stock form filters on email__iexact, which cannot use an index.
+        users = get_user_model()._default_manager.filter(
+            email_normalized=normalize_email_key(email), is_active=True
+        )
+        return (user for user in users if user.has_usable_password())
+
+    def send_mail(self, subject_template_name, email_template_name, context, from_email,
+                  to_email, html_email_template_name=None):
+        subject = "".join(loader.render_to_string(subject_template_name, context).splitlines())
+        body = loader.render_to_string(email_template_name, context)
+        html_body = loader.render_to_string(html_email_template_name, context) if html_email_template_name else ""
+        enqueue_email(subject, body, [to_email], html_body=html_body, from_email=from_email)
+
+
+def claim_batch(limit):
+    """
+    Claim up to ``limit`` due messages for this worker and return them.
+    """
+    now = timezone.now()
+    due = (
+        OutboundEmail.objects.filter(
+            Q(status=OutboundEmail.PENDING) | Q(status=OutboundEmail.SENDING),
+            next_attempt_at__lte=now,
+        )
+        .order_by("next_attempt_at", "id")
+        .values_list("pk", flat=True)[:limit]
+    )
+    claim = uuid.uuid4().hex
+    timeout = getattr(settings, "OUTBOX_CLAIM_TIMEOUT", 600)
+    OutboundEmail.objects.filter(pk__in=list(due), next_attempt_at__lte=now).update(
+        status=OutboundEmail.SENDING, claim=claim, next_attempt_at=now + timedelta(seconds=timeout)
+    )
+    return list(OutboundEmail.objects.filter(claim=claim, status=OutboundEmail.SENDING).order_by("id"))
+
+
+def build_message(outbound, connection):
+    message = EmailMultiAlternatives(
+        outbound.subject, outbound.body, outbound.from_email, outbound.to, connection=connection
+    )
+    if outbound.html_body:
+        message.attach_alternative(outbound.html_body, "text/html")
+    return message
+
+
+def record_failure(outbound, error):
+    attempts = outbound.attempts + 1
+    max_attempts = getattr(settings, "OUTBOX_MAX_ATTEMPTS", 5)
+    delay = getattr(settings, "OUTBOX_RETRY_DELAY", 60) * 2 ** (attempts - 1)
+    OutboundEmail.objects.filter(pk=outbound.pk).update(
+        status=OutboundEmail.FAILED if attempts >= max_attempts else OutboundEmail.PENDING,
+        attempts=attempts,
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        claim="",
+        last_error=str(error)[:2000],
+    )
+
+
+def record_sent(outbound):
+    OutboundEmail.objects.filter(pk=outbound.pk).update(
+        status=OutboundEmail.SENT, sent_at=timezone.now(), claim="", attempts=outbound.attempts + 1
+    )
+
+
+def defer(batch, error):
+    """
+    Put claimed messages back for a later run without counting an attempt.
+    """
+    delay = getattr(settings, "OUTBOX_RETRY_DELAY", 60)
+    OutboundEmail.objects.filter(pk__in=[outbound.pk for outbound in batch]).update(
+        status=OutboundEmail.PENDING,
+        next_attempt_at=timezone.now() + timedelta(seconds=delay),
+        claim="",
+        last_error=str(error)[:2000],
+    )
+
+
+def send_one(outbound, connection):
+    """
+    Send one claimed message and record the outcome. Returns True if sent.
+
+    A lost connection is reopened and the message retried once; if that
+    fails too, MailServerUnavailable is raised and nothing is recorded.
+    """
+    try:
+        build_message(outbound, connection).send()
+    except CONNECTION_ERRORS as exc:
+        logger.warning("SMTP connection lost sending email %s: %s", outbound.pk, exc)
+    except Exception as exc:
+        logger.warning("Failed to send email %s: %s", outbound.pk, exc)
+        record_failure(outbound, exc)
+        return False
+    else:
+        record_sent(outbound)
+        return True
+
+    connection.close()
+    open_connection(connection)
+    try:
+        build_message(outbound, connection).send()
+    except CONNECTION_ERRORS as exc:
+        raise MailServerUnavailable(str(exc) or exc.__class__.__name__) from exc
+    except Exception as exc:
+        logger.warning("Failed to send email %s: %s", outbound.pk, exc)
+        record_failure(outbound, exc)
+        return False
+    record_sent(outbound)
+    return True
+
+
+def drain(connection=None, batch_size=None):
+    """
+    Send everything that is due now over one connection. Returns (sent, failed).
+    """
+    batch_size = batch_size or getattr(settings, "OUTBOX_BATCH_SIZE", 50)
+    connection = connection or get_connection()
+    sent = failed = 0
+    try:
+        while True:
+            batch = claim_batch(batch_size)
+            if not batch:
+                break
+            index = 0
+            try:
+                open_connection(connection)
+                for index, outbound in enumerate(batch):
+                    if send_one(outbound, connection):
+                        sent += 1
+                    else:
+                        failed += 1
+            except MailServerUnavailable as exc:
+                logger.warning("Mail server unavailable, deferring %d email(s): %s", len(batch) - index, exc)
+                defer(batch[index:], exc)
+                break
+    finally:
+        connection.close()
+    return sent, failed
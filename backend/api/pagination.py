@@ -0,0 +1,134 @@
+import base64
+import json
+
+from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+
+
+def encode_cursor(payload):
+    """Opaque, URL-safe cursor token for a small dict of position values."""
+    raw = json.dumps(payload, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Inverse of encode_cursor; raises ValueError for malformed tokens."""
+    try:
+        padded = token + '=' * (-len(token) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (TypeError, ValueError) as exc:
+        raise ValueError('Invalid cursor') from exc
+    if not isinstance(payload, dict):
+        raise ValueError('Invalid cursor')
+    return payload
+
+
+class KeysetPagination(BasePagination):
+    """
+    Opt-in cursor pagination ordered by (date, id), newest first.
+
+    Only kicks in when the request carries ``cursor`` or ``page_size``;
+    otherwise the view returns the full list as before. Each page is a
+    range scan on the (date, id) index, so its cost does not depend on
+    how deep into the archive the client is.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    date_field = 'date'
+    invalid_cursor_message = 'Invalid cursor'
+
+    def __init__(self):
+        self.page_size = getattr(settings, 'API_PAGE_SIZE', 20)
+        self.max_page_size = getattr(settings, 'API_MAX_PAGE_SIZE', 100)
+
+    def is_requested(self, request):
+        params = request.query_params
+        return self.cursor_query_param in params or self.page_size_query_param in params
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            size = self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def cursor_for(self, obj, reverse):
+        return encode_cursor({
+            'd': getattr(obj, self.date_field).isoformat(),
+            'i': obj.pk,
+            'r': int(reverse),
+        })
+
+    def get_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            payload = decode_cursor(encoded)
+            date = parse_datetime(payload['d'])
+            if date is None:
+                raise ValueError
+            return date, int(payload['i']), bool(payload.get('r'))
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        if not self.is_requested(request):
+            return None
+
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.get_cursor(request)
+        reverse = bool(cursor and cursor[2])
+        date_field = self.date_field
+
+        if cursor:
+            date, pk = cursor[0], cursor[1]
+            if reverse:
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__gt': date}) | Q(**{date_field: date, 'pk__gt': pk})
+                )
+            else:
+                queryset = queryset.filter(
+                    Q(**{f'{date_field}__lt': date}) | Q(**{date_field: date, 'pk__lt': pk})
+                )
+
+        if reverse:
+            queryset = queryset.order_by(date_field, 'pk')
+        else:
+            queryset = queryset.order_by(f'-{date_field}', '-pk')
+
+        # Fetch one extra row to know whether another page exists.
+        results = list(queryset[:page_size + 1])
+        has_more = len(results) > page_size
+        results = results[:page_size]
+        if reverse:
+            results.reverse()
+
+        self.next_cursor = None
+        self.previous_cursor = None
+        if results:
+            if has_more or reverse:
+                self.next_cursor = self.cursor_for(results[-1], reverse=False)
+            if cursor and (has_more or not reverse):
+                self.previous_cursor = self.cursor_for(results[0], reverse=True)
+        return results
+
+    def get_paginated_data(self, data):
+        return {
+            'next': self.next_cursor,
+            'previous': self.previous_cursor,
+            'results': data,
+        }
+
+    def get_paginated_response(self, data):
+        return Response(self.get_paginated_data(data))
+
+
+class CommentPagination(KeysetPagination):
+    """Top-level comments, newest first, keyed on (created_at, id)."""
+    date_field = 'created_at'
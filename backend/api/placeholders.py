@@ -0,0 +1,95 @@
+"""
+Tiny image summaries the frontend can render before the image loads:
+a dominant colour and a BlurHash (https://blurha.sh) string.
+
+Both work on a thumbnail of at most SAMPLE_SIZE pixels a side, so they
+cost a few milliseconds per image and are computed once, alongside the
+resized variants (api/images.py).
+"""
+import math
+
+from PIL import Image
+
+SAMPLE_SIZE = 32
+BASE83 = "0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz#$%*+,-.:;=?@[]^_{|}~"
+
+
+def sample(image):
+    thumbnail = image.convert("RGB")
+    thumbnail.thumbnail((SAMPLE_SIZE, SAMPLE_SIZE), Image.BILINEAR)
+    return thumbnail
+
+
+def dominant_color(image):
+    """
+    Hex colour of the most common of a handful of quantized colours.
+    """
+    quantized = sample(image).quantize(colors=5, method=Image.Quantize.MEDIANCUT)
+    _, index = max(quantized.getcolors())
+    r, g, b = quantized.getpalette()[index * 3:index * 3 + 3]
+    return f"#{r:02x}{g:02x}{b:02x}"
+
+
+def encode83(value, length):
+    return "".join(BASE83[(value // 83 ** (length - i - 1)) % 83] for i in range(length))
+
+
+def srgb_to_linear(value):
+    v = value / 255
+    return v / 12.92 if v <= 0.04045 else ((v + 0.055) / 1.055) ** 2.4
+
+
+def linear_to_srgb(value):
+    v = max(0.0, min(1.0, value))
+    if v <= 0.0031308:
+        return int(v * 12.92 * 255 + 0.5)
+    return int((1.055 * v ** (1 / 2.4) - 0.055) * 255 + 0.5)
+
+
+def sign_pow(value, exponent):
+    return math.copysign(abs(value) ** exponent, value)
+
+
+def blurhash(image, x_components=4, y_components=3):
+    thumbnail = sample(image)
+    width, height = thumbnail.size
+    pixels = [tuple(srgb_to_linear(c) for c in pixel) for pixel in thumbnail.getdata()]
+
+    cos_x = [[math.cos(math.pi * i * x / width) for x in range(width)] for i in range(x_components)]
+    cos_y = [[math.cos(math.pi * j * y / height) for y in range(height)] for j in range(y_components)]
+
+    factors = []
+    for j in range(y_components):
+        for i in range(x_components):
+            scale = (1 if i == j == 0 else 2) / (width * height)
+            r = g = b = 0.0
+            for y in range(height):
+                row = y * width
+                cy = cos_y[j][y]
+                for x in range(width):
+                    basis = cos_x[i][x] * cy
+                    pr, pg, pb = pixels[row + x]
+                    r += basis * pr
+                    g += basis * pg
+                    b += basis * pb
+            factors.append((r * scale, g * scale, b * scale))
+
+    dc, ac = factors[0], factors[1:]
+    result = encode83((x_components - 1) + (y_components - 1) * 9, 1)
+    if ac:
+        actual_max = max(abs(c) for factor in ac for c in factor)
+        quantized_max = int(max(0, min(82, math.floor(actual_max * 166 - 0.5))))
+        maximum = (quantized_max + 1) / 166
+        result += encode83(quantized_max, 1)
+    else:
+        maximum = 1
+        result += encode83(0, 1)
+
+    r, g, b = (linear_to_srgb(c) for c in dc)
+    result += encode83((r << 16) + (g << 8) + b, 4)
+    for factor in ac:
+        qr, qg, qb = (
+            int(max(0, min(18, math.floor(sign_pow(c / maximum, 0.5) * 9 + 9.5)))) for c in factor
+        )
+        result += encode83(qr * 19 * 19 + qg * 19 + qb, 2)
+    return result
@@ -0,0 +1,127 @@
+"""
+Deduplicated comment likes/dislikes.
+
+Each client holds at most one reaction per comment, enforced by a unique
+constraint on CommentReaction. A client is its user id when signed in,
+otherwise its IP taken the way DRF throttles take it; nothing the client
+sends (such as the User-Agent) goes into the fingerprint, so it cannot
+mint new identities. A per-process Bloom filter of (comment, fingerprint)
+keys answers "definitely never reacted" without a query, so only possible
+repeats are looked up. Counter changes for a whole batch are folded into
+one ``likes = likes + x, dislikes = dislikes + y`` UPDATE per comment.
+"""
+import hashlib
+import threading
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Greatest
+from rest_framework.throttling import BaseThrottle
+
+from .bloom import BloomFilter
+from .models import Comment, CommentReaction
+
+COUNTER_FIELDS = {
+    CommentReaction.LIKE: "likes",
+    CommentReaction.DISLIKE: "dislikes",
+}
+
+_seen_lock = threading.Lock()
+_seen = None
+
+
+def seen_filter():
+    global _seen
+    if _seen is None or _seen.is_saturated():
+        # Starting over only costs extra lookups, never wrong answers.
+        _seen = BloomFilter(getattr(settings, "REACTION_BLOOM_CAPACITY", 100000))
+    return _seen
+
+
+def client_fingerprint(request):
+    user = getattr(request, "user", None)
+    if user is not None and user.is_authenticated:
+        client = f"user|{user.pk}"
+    else:
+        # The address nginx appended (REST_FRAMEWORK NUM_PROXIES), not the
+        # leftmost X-Forwarded-For entry, which the client can set freely.
+        client = f"ip|{BaseThrottle().get_ident(request)}"
+    raw = f"{settings.SECRET_KEY}|{client}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()[:32]
+
+
+def reaction_key(comment_id, fingerprint):
+    return f"{comment_id}:{fingerprint}"
+
+
+def apply_reactions(fingerprint, reactions):
+    """
+    Record ``reactions`` ([(comment_id, kind), ...]) for one client.
+
+    Repeating a reaction is a no-op and switching kind moves the vote.
+    Returns {comment_id: {"likes": n, "dislikes": n}} for the comments
+    that exist.
+    """
+    # Last write wins within a batch.
+    wanted = {}
+    for comment_id, kind in reactions:
+        wanted[int(comment_id)] = kind
+    if not wanted:
+        return {}
+
+    existing_ids = set(Comment.objects.filter(pk__in=wanted).values_list("pk", flat=True))
+    wanted = {pk: kind for pk, kind in wanted.items() if pk in existing_ids}
+
+    with _seen_lock:
+        seen = seen_filter()
+        maybe_seen = [pk for pk in wanted if reaction_key(pk, fingerprint) in seen]
+
+    previous = {}
+    if maybe_seen:
+        previous = dict(
+            CommentReaction.objects.filter(comment_id__in=maybe_seen, fingerprint=fingerprint)
+            .values_list("comment_id", "kind")
+        )
+
+    deltas = defaultdict(lambda: defaultdict(int))
+    with transaction.atomic():
+        for pk, kind in wanted.items():
+            old_kind = previous.get(pk)
+            if old_kind == kind:
+                continue
+            if old_kind is None:
+                try:
+                    with transaction.atomic():
+                        CommentReaction.objects.create(comment_id=pk, fingerprint=fingerprint, kind=kind)
+                except IntegrityError:
+                    # Filter miss raced with another worker; switch if needed.
+                    old_kind = CommentReaction.objects.filter(
+                        comment_id=pk, fingerprint=fingerprint
+                    ).values_list("kind", flat=True).first()
+                    if old_kind == kind or old_kind is None:
+                        continue
+            if old_kind is not None:
+                switched = CommentReaction.objects.filter(
+                    comment_id=pk, fingerprint=fingerprint, kind=old_kind
+                ).update(kind=kind)
+                if not switched:
+                    continue
+                deltas[pk][COUNTER_FIELDS[old_kind]] -= 1
+            deltas[pk][COUNTER_FIELDS[kind]] += 1
+
+        for pk, changes in deltas.items():
+            Comment.objects.filter(pk=pk).update(**{
+                field: Greatest(F(field) + delta, 0) for field, delta in changes.items()
+            })
+
+    with _seen_lock:
+        seen = seen_filter()
+        for pk in wanted:
+            seen.add(reaction_key(pk, fingerprint))
+
+    return {
+        pk: {"likes": likes, "dislikes": dislikes}
+        for pk, likes, dislikes in Comment.objects.filter(pk__in=wanted).values_list("pk", "likes", "dislikes")
+    }
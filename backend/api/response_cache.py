@@ -0,0 +1,172 @@
+"""
+Opt-in caching of public GET responses.
+
+A view opts in by mixing in CachedResponseMixin and declaring::
+
+    cache_ttl = 60                      # seconds a response stays fresh
+    cache_depends_on = (Blog, Author)   # models whose writes invalidate it
+
+Cache keys cover the view, the path, the sorted query string and the
+current version of every model the view depends on. post_save/post_delete
+on one of those models bumps its version, so the next request misses
+instead of serving outdated data. Once a response is older than its TTL it
+is still served for RESPONSE_CACHE_STALE seconds while a single request
+(the one that wins the refresh lock) recomputes it; concurrent misses on
+the same key wait briefly for that request instead of all hitting the
+database.
+
+Entries live in the RESPONSE_CACHE_ALIAS cache. Any Django backend works;
+use a shared one (the file-based cache in settings) so invalidations reach
+every gunicorn worker. Model versions live in RESPONSE_CACHE_VERSIONS_ALIAS,
+a cache holding nothing else so they are never culled to make room for
+responses; a version that is missing anyway restarts from the current
+time in milliseconds, never from a value an old entry could have used.
+"""
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+
+# Validators kept with cached bodies so hits can still answer with a 304.
+CACHED_HEADERS = ("ETag", "Last-Modified")
+LOCK_TIMEOUT = 10
+WAIT_STEP = 0.05
+
+
+def response_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_ALIAS", "default")]
+
+
+def namespace():
+    # Keeps entries from different databases (e.g. test runs) apart.
+    name = str(connection.settings_dict.get("NAME"))
+    return "rc:" + hashlib.md5(name.encode()).hexdigest()[:8]
+
+
+def version_cache():
+    return caches[getattr(settings, "RESPONSE_CACHE_VERSIONS_ALIAS", "default")]
+
+
+def version_key(model):
+    return f"{namespace()}:v:{model._meta.label_lower}"
+
+
+def initial_version():
+    return int(time.time() * 1000)
+
+
+def model_versions(models):
+    cache = version_cache()
+    keys = [version_key(model) for model in models]
+    versions = cache.get_many(keys)
+    for key in keys:
+        if key not in versions:
+            cache.add(key, initial_version(), None)
+            versions[key] = cache.get(key)
+    return [versions[key] for key in keys]
+
+
+def bump_model_version(sender, **kwargs):
+    cache = version_cache()
+    key = version_key(sender)
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, initial_version(), None)
+
+
+class CachedResponseMixin:
+    cache_ttl = 60
+    cache_depends_on = ()
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        for model in cls.cache_depends_on:
+            uid = f"response_cache:{model._meta.label_lower}"
+            post_save.connect(bump_model_version, sender=model, dispatch_uid=uid + ":save")
+            post_delete.connect(bump_model_version, sender=model, dispatch_uid=uid + ":delete")
+
+    def get_cache_key(self, request):
+        query = "&".join(sorted(request.GET.urlencode().split("&")))
+        versions = ".".join(str(v) for v in model_versions(self.cache_depends_on))
+        raw = f"{request.path}?{query}"
+        digest = hashlib.md5(raw.encode()).hexdigest()
+        return f"{namespace()}:{type(self).__name__}:{versions}:{digest}"
+
+    def is_cacheable_request(self, request):
+        if request.method != "GET" or not getattr(settings, "RESPONSE_CACHE_ENABLED", True):
+            return False
+        # The browsable API is rendered per client; only cache JSON.
+        return "text/html" not in request.META.get("HTTP_ACCEPT", "")
+
+    def dispatch(self, request, *args, **kwargs):
+        if not self.is_cacheable_request(request):
+            return super().dispatch(request, *args, **kwargs)
+
+        cache = response_cache()
+        key = self.get_cache_key(request)
+        lock_key = key + ":lock"
+        entry = cache.get(key)
+
+        if entry is not None:
+            if entry["fresh_until"] > time.time():
+                return self.cached_response(request, entry, "HIT")
+            # Stale: one request refreshes, the rest keep serving the old body.
+            holds_lock = cache.add(lock_key, 1, LOCK_TIMEOUT)
+            if not holds_lock:
+                return self.cached_response(request, entry, "STALE")
+        else:
+            holds_lock = cache.add(lock_key, 1, LOCK_TIMEOUT)
+            if not holds_lock:
+                # Someone else is computing this key; give them a moment.
+                deadline = time.time() + getattr(settings, "RESPONSE_CACHE_WAIT", 2)
+                while time.time() < deadline:
+                    time.sleep(WAIT_STEP)
+                    entry = cache.get(key)
+                    if entry is not None:
+                        return self.cached_response(request, entry, "HIT")
+
+        try:
+            response = super().dispatch(request, *args, **kwargs)
+            if response.streaming:
+                # Buffering a stream would defeat its purpose.
+                return response
+            if hasattr(response, "render"):
+                response.render()
+            if response.status_code == 200:
+                stale = getattr(settings, "RESPONSE_CACHE_STALE", 300)
+                cache.set(key, {
+                    "fresh_until": time.time() + self.cache_ttl,
+                    "status": response.status_code,
+                    "content_type": response.get("Content-Type"),
+                    "content": response.content,
+                    "headers": {name: response[name] for name in CACHED_HEADERS if response.has_header(name)},
+                }, self.cache_ttl + stale)
+            response["X-Cache"] = "MISS"
+            return response
+        finally:
+            # A request that timed out waiting computes too, but the lock
+            # is not its to release.
+            if holds_lock:
+                cache.delete(lock_key)
+
+    def cached_response(self, request, entry, state):
+        headers = entry.get("headers", {})
+        response = HttpResponse(entry["content"], status=entry["status"], content_type=entry["content_type"])
+        for name, value in headers.items():
+            response[name] = value
+        if headers:
+            response = get_conditional_response(
+                request,
+                etag=headers.get("ETag"),
+                last_modified=parse_http_date_safe(headers.get("Last-Modified", "")),
+                response=response,
+            )
+        response["X-Cache"] = state
+        return response
@@ -0,0 +1,151 @@
+"""
+Revoked JWTs.
+
+Revoking a token stores its ``jti`` as a RevokedToken row. Every worker
+keeps the unexpired jtis in memory: a Bloom filter that answers "never
+revoked" for almost every token, backed by an exact jti -> expiry map for
+the rare filter hits, so the per-request check needs no query.
+
+The in-memory copy is brought up to date at most every
+REVOCATION_REFRESH_INTERVAL seconds by fetching only rows with a higher
+id than the last one seen; a token revoked in another worker is honoured
+here within that interval. Every REVOCATION_COMPACT_INTERVAL seconds a
+worker deletes rows for tokens that have expired anyway (they would fail
+signature validation) and rebuilds its filter from what is left.
+"""
+import logging
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .bloom import BloomFilter
+from .models import RevokedToken
+
+logger = logging.getLogger(__name__)
+
+
+def token_expiry(token):
+    return datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+
+
+class RevocationList:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """
+        Forget everything; the next check reloads from the table.
+        """
+        with self._lock:
+            self.expiry = {}
+            self.bloom = self._new_filter()
+            self.last_id = 0
+            self.checked_at = float("-inf")
+            self.compacted_at = float("-inf")
+
+    def _new_filter(self, size=0):
+        capacity = getattr(settings, "REVOCATION_BLOOM_CAPACITY", 10000)
+        return BloomFilter(max(capacity, size * 2))
+
+    def _add(self, jti, expires_at):
+        self.expiry[jti] = expires_at.timestamp()
+        if self.bloom.is_saturated():
+            self._rebuild()
+        else:
+            self.bloom.add(jti)
+
+    def _rebuild(self):
+        self.bloom = self._new_filter(len(self.expiry))
+        for jti in self.expiry:
+            self.bloom.add(jti)
+
+    def add(self, jti, expires_at):
+        with self._lock:
+            self._add(jti, expires_at)
+
+    def refresh(self, force=False):
+        """
+        Pull rows added since the last refresh, or compact and reload
+        everything when REVOCATION_COMPACT_INTERVAL has passed.
+        """
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self.checked_at < getattr(settings, "REVOCATION_REFRESH_INTERVAL", 5):
+                return
+            self.checked_at = now
+            compact = now - self.compacted_at >= getattr(settings, "REVOCATION_COMPACT_INTERVAL", 600)
+            if compact:
+                self.compacted_at = now
+            last_id = self.last_id
+
+        if compact:
+            purge_expired()
+            last_id = 0
+        rows = list(
+            RevokedToken.objects.filter(pk__gt=last_id, expires_at__gt=timezone.now())
+            .order_by("pk").values_list("pk", "jti", "expires_at")
+        )
+
+        with self._lock:
+            if compact:
+                cutoff = time.time()
+                self.expiry = {jti: expires for jti, expires in self.expiry.items() if expires > cutoff}
+                self.expiry.update((jti, expires_at.timestamp()) for _, jti, expires_at in rows)
+                self._rebuild()
+            else:
+                for _, jti, expires_at in rows:
+                    self._add(jti, expires_at)
+            if rows:
+                self.last_id = max(self.last_id, rows[-1][0])
+
+    def is_revoked(self, jti):
+        if not jti:
+            return False
+        self.refresh()
+        if jti not in self.bloom:
+            return False
+        with self._lock:
+            expires = self.expiry.get(jti)
+        return expires is not None and expires > time.time()
+
+
+revocation_list = RevocationList()
+
+
+def purge_expired():
+    """
+    Delete rows for tokens past their expiry. Ids are never reused
+    (AUTOINCREMENT primary key), so the incremental refresh still sees
+    every row added afterwards.
+    """
+    deleted, _ = RevokedToken.objects.filter(expires_at__lte=timezone.now()).delete()
+    if deleted:
+        logger.info("Purged %d expired revoked tokens", deleted)
+    return deleted
+
+
+def revoke_token(token):
+    """
+    Revoke a validated simplejwt token in every worker.
+    """
+    jti = token[api_settings.JTI_CLAIM]
+    expires_at = token_expiry(token)
+    RevokedToken.objects.get_or_create(
+        jti=jti,
+        defaults={
+            "token_type": token.get(api_settings.TOKEN_TYPE_CLAIM, ""),
+            "user": get_user_model().objects.filter(pk=token.get(api_settings.USER_ID_CLAIM)).first(),
+            "expires_at": expires_at,
+        },
+    )
+    revocation_list.add(jti, expires_at)
+
+
+def is_revoked(token):
+    return revocation_list.is_revoked(token.get(api_settings.JTI_CLAIM))
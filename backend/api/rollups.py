@@ -0,0 +1,140 @@
+"""
+Daily and monthly post counts per category, for the dashboard.
+
+Creating, deleting or re-categorising a Blog/Community adjusts the
+matching PostRollup buckets with atomic F() updates, so dashboard queries
+read one row per bucket and category instead of grouping the content
+tables. ``manage.py rebuild_rollups`` recomputes everything from scratch.
+"""
+from datetime import timedelta
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, F, Q, Sum
+from django.db.models.functions import Greatest, TruncDay, TruncMonth
+from django.utils import timezone
+
+from .models import Blog, Community, PostRollup
+
+KINDS = {
+    Blog: "blog",
+    Community: "community",
+}
+
+
+def bucket_periods(moment):
+    day = timezone.localtime(moment).date()
+    return {
+        PostRollup.DAY: day,
+        PostRollup.MONTH: day.replace(day=1),
+    }
+
+
+def bump_bucket(kind, granularity, period, category, delta):
+    lookup = dict(kind=kind, granularity=granularity, period=period, category=category)
+    updated = PostRollup.objects.filter(**lookup).update(count=Greatest(F("count") + delta, 0))
+    if updated or delta < 0:
+        return
+    try:
+        with transaction.atomic():
+            PostRollup.objects.create(count=delta, **lookup)
+    except IntegrityError:
+        # Created concurrently by another worker.
+        PostRollup.objects.filter(**lookup).update(count=F("count") + delta)
+
+
+def record_post(post, delta, category=None):
+    kind = KINDS[type(post)]
+    for granularity, period in bucket_periods(post.date).items():
+        bump_bucket(kind, granularity, period, category or post.category, delta)
+
+
+def record_category_change(post, old_category):
+    if old_category is not None and old_category != post.category:
+        record_post(post, -1, category=old_category)
+        record_post(post, 1)
+
+
+def rollup_series(kind, granularity, start, end):
+    """
+    [(period, count)] for every non-empty bucket between start and end.
+    """
+    return list(
+        PostRollup.objects.filter(
+            kind=kind, granularity=granularity, period__gte=start, period__lte=end, count__gt=0
+        )
+        .values_list("period")
+        .annotate(total=Sum("count"))
+        .order_by("period")
+    )
+
+
+def next_month(day):
+    return (day.replace(day=1) + timedelta(days=32)).replace(day=1)
+
+
+def range_buckets(start=None, end=None):
+    """
+    Q selecting buckets that add up to exactly start..end (inclusive):
+    MONTH buckets for the months wholly inside it, DAY buckets for the
+    partial months at either end.
+    """
+    # Whole months are those from first_month up to (not including) last_month.
+    first_month = start if start is None or start.day == 1 else next_month(start)
+    last_month = None if end is None else (end + timedelta(days=1)).replace(day=1)
+    if first_month is not None and last_month is not None and first_month >= last_month:
+        return Q(granularity=PostRollup.DAY, period__gte=start, period__lte=end)
+
+    months = Q(granularity=PostRollup.MONTH)
+    days = Q(pk__in=[])
+    if first_month is not None:
+        months &= Q(period__gte=first_month)
+        days |= Q(period__gte=start, period__lt=first_month)
+    if last_month is not None:
+        months &= Q(period__lt=last_month)
+        days |= Q(period__gte=last_month, period__lte=end)
+    return months | (Q(granularity=PostRollup.DAY) & days)
+
+
+def rollup_by_category(kind, start=None, end=None):
+    """
+    [{"category": ..., "count": n}] for posts dated start..end (inclusive).
+    """
+    queryset = PostRollup.objects.filter(range_buckets(start, end), kind=kind, count__gt=0)
+    return list(
+        queryset.values("category").annotate(count=Sum("count")).order_by("-count")
+    )
+
+
+def rollup_total(kind):
+    return PostRollup.objects.filter(
+        kind=kind, granularity=PostRollup.MONTH
+    ).aggregate(total=Sum("count"))["total"] or 0
+
+
+def rebuild_rollups():
+    """
+    Recompute every bucket from the content tables. Returns the number of rows.
+    """
+    rows = []
+    for model, kind in KINDS.items():
+        for granularity, trunc in ((PostRollup.DAY, TruncDay), (PostRollup.MONTH, TruncMonth)):
+            grouped = (
+                model.objects.annotate(period=trunc("date"))
+                .values("period", "category")
+                .annotate(total=Count("id"))
+                .order_by()
+            )
+            rows.extend(
+                PostRollup(
+                    kind=kind,
+                    granularity=granularity,
+                    period=timezone.localtime(entry["period"]).date(),
+                    category=entry["category"],
+                    count=entry["total"],
+                )
+                for entry in grouped
+            )
+    with transaction.atomic():
+        PostRollup.objects.all().delete()
+        PostRollup.objects.bulk_create(rows, batch_size=500)
+    return len(rows)
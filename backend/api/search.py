@@ -0,0 +1,152 @@
+"""
+Full-text search over blogs and community posts using an SQLite FTS5 table.
+
+``api_search_index`` (created in migration 0006) holds one row per post with
+a deterministic rowid, so reindexing a post is a delete + insert by rowid.
+Rows are kept in sync from the Blog/Community save and delete signals.
+Results are ordered by the table's rank (bm25 weighted towards title and
+tags), highlighted with <mark>, and paginated by a (rank, rowid) cursor.
+Highlighted text is HTML-escaped before the <mark> tags go in, so it is
+safe to render as HTML whatever the post contains.
+"""
+import re
+
+from django.db import connection
+from django.utils.html import escape
+
+from .models import Blog, Community
+
+SEARCH_TABLE = "api_search_index"
+
+KINDS = {
+    Blog: ("blog", 0),
+    Community: ("community", 1),
+}
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+# Private-use characters FTS5 wraps matches in; swapped for <mark> tags
+# only after the text around them has been escaped.
+MARK_START = "\ue000"
+MARK_END = "\ue001"
+
+
+def search_available():
+    return connection.vendor == "sqlite"
+
+
+def search_rowid(model, pk):
+    return pk * len(KINDS) + KINDS[model][1]
+
+
+def index_post(instance):
+    if not search_available():
+        return
+    model = type(instance)
+    rowid = search_rowid(model, instance.pk)
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s", [rowid])
+        cursor.execute(
+            f"INSERT INTO {SEARCH_TABLE} "
+            "(rowid, kind, post_id, slug, title, description, content, tags) "
+            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+            [
+                rowid, KINDS[model][0], instance.pk, instance.slug,
+                instance.title, instance.description, instance.content, instance.tags,
+            ],
+        )
+
+
+def unindex_post(instance):
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {SEARCH_TABLE} WHERE rowid = %s",
+            [search_rowid(type(instance), instance.pk)],
+        )
+
+
+def build_match_query(text):
+    """
+    Turn free user input into a safe FTS5 query.
+
+    Every word is quoted so FTS5 operators in the input are treated as
+    text; the last word is a prefix match for search-as-you-type.
+    """
+    tokens = TOKEN_RE.findall(text or "")[:16]
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+def mark_matches(text):
+    """
+    Escape highlighted FTS5 output and turn its match markers into <mark>.
+    """
+    return escape(text or "").replace(MARK_START, "<mark>").replace(MARK_END, "</mark>")
+
+
+def search_posts(text, kind=None, limit=20, after=None):
+    """
+    Return up to ``limit`` matches and the (rank, rowid) of the last one.
+
+    ``after`` is the (rank, rowid) of the previous page's last row.
+    """
+    match = build_match_query(text)
+    if match is None:
+        return [], None
+
+    sql = [
+        "SELECT rowid, rank, kind, post_id, slug,",
+        f"  highlight({SEARCH_TABLE}, 3, '{MARK_START}', '{MARK_END}'),",
+        f"  snippet({SEARCH_TABLE}, -1, '{MARK_START}', '{MARK_END}', '…', 24)",
+        f"FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH %s",
+    ]
+    params = [match]
+    if kind:
+        sql.append("AND kind = %s")
+        params.append(kind)
+    if after is not None:
+        sql.append("AND (rank > %s OR (rank = %s AND rowid > %s))")
+        params.extend([after[0], after[0], after[1]])
+    sql.append("ORDER BY rank, rowid LIMIT %s")
+    params.append(limit + 1)
+
+    with connection.cursor() as cursor:
+        cursor.execute(" ".join(sql), params)
+        rows = cursor.fetchall()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+    results = [
+        {
+            "type": kind_name,
+            "id": post_id,
+            "slug": slug,
+            "link": f"/{kind_name}/{slug}/",
+            "title": mark_matches(title),
+            "snippet": mark_matches(snippet),
+            "score": -rank,
+        }
+        for _, rank, kind_name, post_id, slug, title, snippet in rows
+    ]
+    last = (rows[-1][1], rows[-1][0]) if has_more else None
+    return results, last
+
+
+def rebuild_index():
+    """
+    Repopulate the whole index from the content tables.
+    """
+    if not search_available():
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {SEARCH_TABLE}")
+    for model in KINDS:
+        for instance in model.objects.only(
+            "id", "slug", "title", "description", "content", "tags"
+        ).iterator(chunk_size=500):
+            index_post(instance)
@@ -2,17 +2,23 @@ from rest_framework import serializers
 from django.conf import settings
 from urllib.parse import urljoin
 from .models import *
+from .comments import load_subtree
+from .images import image_srcset
+from .outbox import OutboxPasswordResetForm
+from .utils import normalize_email_key
+from .revocation import is_revoked, revoke_token
 from django.contrib.auth import get_user_model
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
 from django.contrib.auth.tokens import default_token_generator
-from django.contrib.auth.forms import PasswordResetForm
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.tokens import RefreshToken
 from django.core.validators import validate_email
 from django.core.exceptions import ValidationError as DjangoValidationError
 from django.contrib.auth import authenticate
 from django.utils.translation import gettext_lazy as _
-from django.db.models import Sum
+from django.db.models.functions import Lower
 
 
 
@@ -41,12 +47,13 @@ class UserSerializer(serializers.ModelSerializer):
         }
 
     def validate_email(self, value):
-        if User.objects.filter(email__iexact=value).exists():
+        if User.objects.filter(email_normalized=normalize_email_key(value)).exists():
             raise serializers.ValidationError("A user with this email already exists.")
         return value.lower()
 
     def validate_username(self, value):
-        if User.objects.filter(username__iexact=value).exists():
+        # Served by the Lower(username) index; __iexact compiles to LIKE.
+        if User.objects.alias(username_lower=Lower('username')).filter(username_lower=value.lower()).exists():
             raise serializers.ValidationError("A user with this username already exists.")
         return value.lower()
 
@@ -111,9 +118,45 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
     @classmethod
     def get_token(cls, user):
         token = super().get_token(user)
+        token["username"] = user.username
         token["email"] = user.email
         token["email_verified"] = getattr(user, "email_verified", False)
         return token
+
+
+class CustomTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuse to issue access tokens from a revoked refresh token.
+    """
+
+    def validate(self, attrs):
+        try:
+            refresh = RefreshToken(attrs["refresh"])
+        except TokenError as e:
+            raise InvalidToken(e.args[0])
+        if is_revoked(refresh):
+            raise InvalidToken(_("Token has been revoked."))
+        return super().validate(attrs)
+
+
+class LogoutSerializer(serializers.Serializer):
+    refresh = serializers.CharField(
+        required=True,
+        help_text="Refresh token to revoke"
+    )
+
+    def validate_refresh(self, value):
+        try:
+            return RefreshToken(value)
+        except TokenError:
+            raise serializers.ValidationError("Invalid or expired refresh token.")
+
+    def save(self):
+        revoke_token(self.validated_data['refresh'])
+        # Also revoke the access token the request was made with, if any.
+        request = self.context.get('request')
+        if request is not None and request.auth is not None:
+            revoke_token(request.auth)
     
 
 class PasswordResetSerializer(serializers.Serializer):
@@ -125,7 +168,7 @@ class PasswordResetSerializer(serializers.Serializer):
     def validate_email(self, value):
         try:
             validate_email(value)
-            if not User.objects.filter(email__iexact=value).exists():
+            if not User.objects.filter(email_normalized=normalize_email_key(value)).exists():
                 raise serializers.ValidationError("No account found with this email.")
             return value.lower()
         except DjangoValidationError:
@@ -135,7 +178,7 @@ class PasswordResetSerializer(serializers.Serializer):
         request = self.context.get('request')
         email = self.validated_data['email']
         
-        form = PasswordResetForm({'email': email})
+        form = OutboxPasswordResetForm({'email': email})
         if form.is_valid():
             form.save(
                 request=request,
@@ -230,9 +273,18 @@ class ContactMessageSerializer(serializers.ModelSerializer):
         fields = ['id', 'name', 'email', 'message', 'submitted_at']
 
 class AuthorSerializer(serializers.ModelSerializer):
+    profile_picture_srcset = serializers.SerializerMethodField()
+    profile_picture_width = serializers.IntegerField(source='picture_variants.width', read_only=True, allow_null=True)
+    profile_picture_height = serializers.IntegerField(source='picture_variants.height', read_only=True, allow_null=True)
+    profile_picture_color = serializers.CharField(source='picture_variants.color', read_only=True, allow_null=True)
+    profile_picture_placeholder = serializers.CharField(source='picture_variants.placeholder', read_only=True, allow_null=True)
+
     class Meta:
         model = Author
-        fields = ['id', 'name', 'email', 'bio', 'profile_picture']
+        fields = ['id', 'name', 'email', 'bio', 'profile_picture', 'profile_picture_srcset', 'profile_picture_width', 'profile_picture_height', 'profile_picture_color', 'profile_picture_placeholder']
+
+    def get_profile_picture_srcset(self, obj):
+        return image_srcset(obj.picture_variants)
 
 
 class BlogSerializer(serializers.ModelSerializer):
@@ -241,10 +293,15 @@ class BlogSerializer(serializers.ModelSerializer):
         queryset=Author.objects.all(), write_only=True
     ) 
     cover_image = serializers.SerializerMethodField()
+    cover_image_srcset = serializers.SerializerMethodField()
+    cover_image_width = serializers.IntegerField(source='cover_variants.width', read_only=True, allow_null=True)
+    cover_image_height = serializers.IntegerField(source='cover_variants.height', read_only=True, allow_null=True)
+    cover_image_color = serializers.CharField(source='cover_variants.color', read_only=True, allow_null=True)
+    cover_image_placeholder = serializers.CharField(source='cover_variants.placeholder', read_only=True, allow_null=True)
 
     class Meta:
         model = Blog
-        fields = ['id', 'title', 'description', 'content', 'cover_image', 'author', 'author_id', 'date', 'category', 'tags', 'slug', 'views']
+        fields = ['id', 'title', 'description', 'content', 'cover_image', 'author', 'author_id', 'date', 'category', 'tags', 'slug', 'views', 'comment_count', 'thread_count', 'last_comment_at', 'cover_image_srcset', 'cover_image_width', 'cover_image_height', 'cover_image_color', 'cover_image_placeholder']
 
     def get_cover_image(self, obj):
         if obj.cover_image:
@@ -252,6 +309,9 @@ class BlogSerializer(serializers.ModelSerializer):
             return urljoin(settings.SITE_DOMAIN, image_url.lstrip('/'))  # Force full URL
         return None
 
+    def get_cover_image_srcset(self, obj):
+        return image_srcset(obj.cover_variants)
+
 class BlogCreateUpdateSerializer(serializers.ModelSerializer):
        # This field accepts an integer PK and writes it to the Blog.author FK
     author_id = serializers.PrimaryKeyRelatedField(
@@ -270,10 +330,15 @@ class BlogCreateUpdateSerializer(serializers.ModelSerializer):
 class BlogSummarySerializer(serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True)
     cover_image = serializers.SerializerMethodField()
+    cover_image_srcset = serializers.SerializerMethodField()
+    cover_image_width = serializers.IntegerField(source='cover_variants.width', read_only=True, allow_null=True)
+    cover_image_height = serializers.IntegerField(source='cover_variants.height', read_only=True, allow_null=True)
+    cover_image_color = serializers.CharField(source='cover_variants.color', read_only=True, allow_null=True)
+    cover_image_placeholder = serializers.CharField(source='cover_variants.placeholder', read_only=True, allow_null=True)
 
     class Meta:
         model = Blog
-        fields = ['id', 'title', 'cover_image', 'author', 'date', 'slug', 'views']
+        fields = ['id', 'title', 'cover_image', 'author', 'date', 'slug', 'views', 'comment_count', 'last_comment_at', 'cover_image_srcset', 'cover_image_width', 'cover_image_height', 'cover_image_color', 'cover_image_placeholder']
 
     def get_cover_image(self, obj):
         if obj.cover_image:
@@ -281,19 +346,43 @@ class BlogSummarySerializer(serializers.ModelSerializer):
             return urljoin(settings.SITE_DOMAIN, image_url.lstrip('/'))  # Force full URL
         return None
 
+    def get_cover_image_srcset(self, obj):
+        return image_srcset(obj.cover_variants)
+
         
 class CommentSerializer(serializers.ModelSerializer):
     replies = serializers.SerializerMethodField()  # Fetch nested replies
 
     class Meta:
         model = Comment
-        fields = ['id', 'name', 'email', 'message', 'blog', 'parent', 'likes', 'dislikes', 'created_at', 'replies']
-        read_only_fields = ['id', 'created_at', 'likes', 'dislikes']  # These fields shouldn't be modified directly
+        fields = ['id', 'name', 'email', 'message', 'blog', 'parent', 'root', 'depth', 'likes', 'dislikes', 'created_at', 'replies']
+        read_only_fields = ['id', 'root', 'depth', 'created_at', 'likes', 'dislikes']  # These fields shouldn't be modified directly
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if self.instance is not None:
+            # path/root/depth and the post's comment counts are fixed at
+            # insert, so a comment cannot be moved to another parent or post.
+            self.fields['blog'].read_only = True
+            self.fields['parent'].read_only = True
+
+    def validate(self, attrs):
+        parent = attrs.get('parent')
+        if parent is not None:
+            blog = attrs.get('blog') or getattr(self.instance, 'blog', None)
+            if blog is not None and parent.blog_id != blog.pk:
+                raise serializers.ValidationError({'parent': 'Parent comment belongs to a different post.'})
+            if parent.depth + 1 > Comment.MAX_DEPTH:
+                raise serializers.ValidationError({'parent': 'Replies are nested too deeply.'})
+        return attrs
 
     def get_replies(self, obj):
-        """Fetch only direct replies to this comment."""
-        replies = obj.replies.all()
-        return CommentSerializer(replies, many=True).data     
+        """Direct replies, from the tree attached by api/comments.py."""
+        if not hasattr(obj, 'thread_replies'):
+            if not obj.path:
+                return []
+            load_subtree(obj)
+        return CommentSerializer(obj.thread_replies, many=True, context=self.context).data
     
 class CommunitySerializer(serializers.ModelSerializer):
     author = AuthorSerializer(read_only=True)
@@ -301,16 +390,24 @@ class CommunitySerializer(serializers.ModelSerializer):
         queryset=Author.objects.all(), write_only=True
     ) 
     cover_image = serializers.SerializerMethodField()
+    cover_image_srcset = serializers.SerializerMethodField()
+    cover_image_width = serializers.IntegerField(source='cover_variants.width', read_only=True, allow_null=True)
+    cover_image_height = serializers.IntegerField(source='cover_variants.height', read_only=True, allow_null=True)
+    cover_image_color = serializers.CharField(source='cover_variants.color', read_only=True, allow_null=True)
+    cover_image_placeholder = serializers.CharField(source='cover_variants.placeholder', read_only=True, allow_null=True)
 
     class Meta:
         model = Community
-        fields = ['id', 'title', 'description', 'content', 'cover_image', 'author', 'author_id', 'date', 'category', 'tags', 'slug', 'views']
+        fields = ['id', 'title', 'description', 'content', 'cover_image', 'author', 'author_id', 'date', 'category', 'tags', 'slug', 'views', 'cover_image_srcset', 'cover_image_width', 'cover_image_height', 'cover_image_color', 'cover_image_placeholder']
 
     def get_cover_image(self, obj):
         if obj.cover_image:
             image_url = obj.cover_image.url 
             return urljoin(settings.SITE_DOMAIN, image_url.lstrip('/'))
         return None
+
+    def get_cover_image_srcset(self, obj):
+        return image_srcset(obj.cover_variants)
     
 class CommunityCreateUpdateSerializer(serializers.ModelSerializer):
        # This field accepts an integer PK and writes it to the Blog.author FK
@@ -346,7 +443,11 @@ class UserPublicProfileSerializer(serializers.Serializer):
         return f"{obj.first_name} {obj.last_name}".strip()
 
     def get_author(self, obj):
-        return Author.objects.filter(email__iexact=obj.email).first()
+        # Linked one-to-one; select_related('author') makes this query-free.
+        try:
+            return obj.author
+        except Author.DoesNotExist:
+            return None
 
     def get_bio(self, obj):
         author = self.get_author(obj)
@@ -362,19 +463,15 @@ class UserPublicProfileSerializer(serializers.Serializer):
             return urljoin(settings.SITE_DOMAIN, author.profile_picture.url.lstrip("/"))
         return None
 
+    # Totals come from the rollup columns on Author (api/author_stats.py).
     def get_total_blogs(self, obj):
         author = self.get_author(obj)
-        return Blog.objects.filter(author=author).count() if author else 0
+        return author.blog_count if author else 0
 
     def get_total_communities(self, obj):
         author = self.get_author(obj)
-        return Community.objects.filter(author=author).count() if author else 0
+        return author.community_count if author else 0
 
     def get_total_views(self, obj):
         author = self.get_author(obj)
-        if not author:
-            return 0
-        blog_views = Blog.objects.filter(author=author).aggregate(total=Sum('views'))['total'] or 0
-        community_views = Community.objects.filter(author=author).aggregate(total=Sum('views'))['total'] or 0
-        return blog_views + community_views
-
+        return author.total_views if author else 0
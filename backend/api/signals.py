@@ -0,0 +1,157 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete, pre_save
+from django.dispatch import receiver
+
+from .authentication import user_cache
+from .author_stats import record_author_change, record_post_added, record_post_removed
+from .comments import record_comment_added, record_comment_removed
+from .images import image_worker, needs_variants
+from .models import Author, Blog, Comment, Community, User
+from .rollups import record_category_change, record_post
+from .search import index_post, unindex_post
+from .snapshots import MODEL_SNAPSHOTS, mark_stale
+from .tags import release_tags, sync_tags
+from .trending import COMMENT_WEIGHT, NEW_POST_WEIGHT, bump, seed
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+def sync_post_tags(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or "tags" in update_fields:
+        sync_tags(instance)
+
+
+@receiver(pre_delete, sender=Blog)
+@receiver(pre_delete, sender=Community)
+def release_post_tags(sender, instance, **kwargs):
+    # The tag links are gone by post_delete, so count them down here.
+    release_tags(instance)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Community)
+def invalidate_snapshots(sender, instance, update_fields=None, **kwargs):
+    # View-count bumps would otherwise rebuild on every detail read;
+    # those are picked up by SNAPSHOT_MAX_AGE instead.
+    if update_fields is not None and set(update_fields) == {"views"}:
+        return
+    for key in MODEL_SNAPSHOTS[sender]:
+        mark_stale(key)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+def update_search_index(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and set(update_fields) == {"views"}:
+        return
+    index_post(instance)
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Community)
+def remove_from_search_index(sender, instance, **kwargs):
+    unindex_post(instance)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+def seed_trending_score(sender, instance, created, **kwargs):
+    if created:
+        seed(sender, instance.pk, NEW_POST_WEIGHT, at=instance.date)
+
+
+@receiver(post_save, sender=Comment)
+def credit_comment_to_trending(sender, instance, created, **kwargs):
+    if created:
+        bump(Blog, instance.blog_id, COMMENT_WEIGHT)
+
+
+@receiver(post_save, sender=Comment)
+def count_new_comment(sender, instance, created, **kwargs):
+    if created:
+        record_comment_added(instance)
+
+
+@receiver(post_delete, sender=Comment)
+def count_deleted_comment(sender, instance, **kwargs):
+    record_comment_removed(instance)
+
+
+@receiver(pre_save, sender=Blog)
+@receiver(pre_save, sender=Community)
+def remember_previous_values(sender, instance, update_fields=None, **kwargs):
+    # Author and category feed rollups, so note what they were before an edit.
+    # Reset first: values left over from an earlier save of this instance
+    # would otherwise be applied again by a save that did not touch them.
+    instance._previous_author_id = instance._previous_category = None
+    if instance.pk and (update_fields is None or {"author", "category"} & set(update_fields)):
+        previous = sender.objects.filter(pk=instance.pk).values_list("author_id", "category").first()
+        if previous:
+            instance._previous_author_id, instance._previous_category = previous
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+def update_author_stats(sender, instance, created, **kwargs):
+    if created:
+        record_post_added(instance)
+    else:
+        record_author_change(instance, getattr(instance, "_previous_author_id", None))
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Community)
+def release_author_stats(sender, instance, **kwargs):
+    record_post_removed(instance)
+
+
+@receiver(post_save, sender=Author)
+def link_author_to_user(sender, instance, **kwargs):
+    if instance.user_id is None and instance.email_normalized:
+        user_id = (
+            User.objects.filter(email_normalized=instance.email_normalized)
+            .order_by("id").values_list("id", flat=True).first()
+        )
+        if user_id and not Author.objects.filter(user_id=user_id).exists():
+            Author.objects.filter(pk=instance.pk).update(user_id=user_id)
+            instance.user_id = user_id
+
+
+@receiver(post_save, sender=User)
+def link_user_to_author(sender, instance, created, **kwargs):
+    if created and instance.email_normalized:
+        Author.objects.filter(
+            email_normalized=instance.email_normalized, user__isnull=True
+        ).update(user=instance)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+def update_post_rollups(sender, instance, created, **kwargs):
+    if created:
+        record_post(instance, 1)
+    else:
+        record_category_change(instance, getattr(instance, "_previous_category", None))
+
+
+@receiver(post_delete, sender=Blog)
+@receiver(post_delete, sender=Community)
+def release_post_rollups(sender, instance, **kwargs):
+    record_post(instance, -1)
+
+
+@receiver(post_save, sender=Blog)
+@receiver(post_save, sender=Community)
+@receiver(post_save, sender=Author)
+def queue_image_variants(sender, instance, **kwargs):
+    if needs_variants(instance):
+        pk = instance.pk
+        transaction.on_commit(lambda: image_worker.enqueue(sender, pk))
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def forget_cached_user(sender, instance, **kwargs):
+    user_cache.forget(instance.pk)
@@ -0,0 +1,182 @@
+"""
+Precomputed payloads for the read-mostly /api/blog-data/ and
+/api/community-data/ endpoints.
+
+Each payload is rendered to JSON once and stored in PayloadSnapshot with a
+version number. Saving or deleting a Blog/Community marks the matching
+snapshot stale (see api/signals.py) and it is rebuilt after the transaction
+commits, so readers are served stored bytes and never touch the content
+tables. View counts and trending scores are the only data that changes
+without a signal; they are refreshed by rebuilding snapshots older than
+SNAPSHOT_MAX_AGE seconds.
+"""
+import json
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.db.models.functions import Substr
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils.http import parse_etags
+from django.utils.timezone import now
+
+from .models import Blog, Community, PayloadSnapshot, Tag
+from .trending import top_posts
+from .utils import absolute_media_url
+
+BLOG_DATA = "blog-data"
+COMMUNITY_DATA = "community-data"
+
+
+def listing_rows(queryset):
+    """
+    Sidebar/listing rows from a single projection query.
+
+    Only the returned columns are selected and the description is cut to
+    100 characters by the database, so the full content column is never
+    loaded and the query count does not grow with the number of posts.
+    """
+    rows = (
+        queryset.annotate(short_description=Substr("description", 1, 100))
+        .values("id", "title", "short_description", "cover_image", "category", "slug", "views")
+    )
+    return [
+        {
+            "id": row["id"],
+            "title": row["title"],
+            "description": row["short_description"],
+            "image": absolute_media_url(row["cover_image"]),
+            "category": row["category"],
+            "slug": row["slug"],
+            "views": row["views"],
+        }
+        for row in rows
+    ]
+
+
+def build_blog_data():
+    # Get all unique categories from Blog model
+    categories = Blog.objects.values_list("category", flat=True).distinct()
+
+    # Latest blogs first
+    blog_list = listing_rows(Blog.objects.order_by('-date'))
+
+    # Top 5 trending blogs
+    popular_blogs = top_posts(Blog).values("id", "title", "slug")
+    popular_posts = [
+        {"id": blog["id"], "title": blog["title"], "slug": blog["slug"], "link": f"/blog/{blog['slug']}/"}
+        for blog in popular_blogs
+    ]
+
+    # Dynamic Sidebar Content
+    sidebar_content = {
+        "popularPosts": popular_posts,
+        "tags": list(Tag.objects.filter(blog_count__gt=0).values_list("name", flat=True)),
+    }
+
+    return {
+        "categories": list(categories),
+        "blogs": blog_list,
+        "sidebarContent": sidebar_content,
+    }
+
+
+def build_community_data():
+    categories = Community.objects.values_list("category", flat=True).distinct()
+
+    community_list = listing_rows(Community.objects.order_by('-date'))
+
+    popular_community = top_posts(Community).values("id", "title", "slug")
+    popular_events = [
+        {"id": community["id"], "title": community["title"], "link": f"/community/{community['slug']}/"}
+        for community in popular_community
+    ]
+
+    # Dynamic Sidebar Content
+    sidebar_content = {
+        "popularEvents": popular_events,
+        "tags": list(Tag.objects.filter(community_count__gt=0).values_list("name", flat=True)),
+    }
+
+    return {
+        "categories": list(categories),
+        "community": community_list,
+        "sidebarContent": sidebar_content,
+    }
+
+
+SNAPSHOT_BUILDERS = {
+    BLOG_DATA: build_blog_data,
+    COMMUNITY_DATA: build_community_data,
+}
+
+# Which snapshots depend on which model.
+MODEL_SNAPSHOTS = {
+    Blog: [BLOG_DATA],
+    Community: [COMMUNITY_DATA],
+}
+
+
+def render_snapshot(key):
+    payload = SNAPSHOT_BUILDERS[key]()
+    return json.dumps(
+        payload, cls=DjangoJSONEncoder, ensure_ascii=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def rebuild_snapshot(key, only_if_stale=False):
+    """
+    Render the payload for ``key`` and store it under a new version.
+
+    With ``only_if_stale`` the rebuild is skipped when another caller has
+    already refreshed the row, which collapses the many post_delete
+    signals of a cascading delete into a single rebuild.
+    """
+    if only_if_stale and not PayloadSnapshot.objects.filter(key=key, stale=True).exists():
+        return
+    body = render_snapshot(key)
+    updated = PayloadSnapshot.objects.filter(key=key).update(
+        body=body, version=F("version") + 1, stale=False, built_at=now()
+    )
+    if not updated:
+        try:
+            with transaction.atomic():
+                PayloadSnapshot.objects.create(key=key, body=body, version=1, built_at=now())
+        except IntegrityError:
+            # Another worker created it first; store ours as the next version.
+            PayloadSnapshot.objects.filter(key=key).update(
+                body=body, version=F("version") + 1, stale=False, built_at=now()
+            )
+
+
+def mark_stale(key):
+    """
+    Flag ``key`` for rebuilding once the current transaction commits.
+    """
+    PayloadSnapshot.objects.filter(key=key).update(stale=True)
+    transaction.on_commit(lambda: rebuild_snapshot(key, only_if_stale=True))
+
+
+def get_snapshot(key):
+    max_age = timedelta(seconds=getattr(settings, "SNAPSHOT_MAX_AGE", 300))
+    snapshot = PayloadSnapshot.objects.filter(key=key).first()
+    if snapshot is None or snapshot.stale or snapshot.built_at < now() - max_age:
+        rebuild_snapshot(key)
+        snapshot = PayloadSnapshot.objects.get(key=key)
+    return snapshot
+
+
+def snapshot_response(request, key):
+    """
+    Serve the stored snapshot bytes, answering If-None-Match with a 304.
+    """
+    snapshot = get_snapshot(key)
+    etag = snapshot.etag
+    if etag in parse_etags(request.META.get("HTTP_IF_NONE_MATCH", "")):
+        response = HttpResponseNotModified()
+    else:
+        response = HttpResponse(bytes(snapshot.body), content_type="application/json")
+    response["ETag"] = etag
+    return response
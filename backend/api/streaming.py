@@ -0,0 +1,79 @@
+"""
+Chunked JSON output for large, unpaginated lists.
+
+Views mixing in StreamingListMixin return a StreamingHttpResponse whose
+body has the same envelope as custom_response/standard_response, but the
+list inside it is written batch by batch while the queryset is walked
+with ``iterator(chunk_size=...)``, so memory stays flat however many rows
+there are.
+"""
+import json
+
+from django.conf import settings
+from django.http import StreamingHttpResponse
+from rest_framework.utils.encoders import JSONEncoder
+
+PLACEHOLDER = "__streamed_items__"
+
+
+def dumps(value):
+    # Same output as DRF's JSONRenderer.
+    return json.dumps(value, cls=JSONEncoder, ensure_ascii=False, separators=(",", ":"))
+
+
+def batched(queryset, chunk_size):
+    batch = []
+    for obj in queryset.iterator(chunk_size=chunk_size):
+        batch.append(obj)
+        if len(batch) >= chunk_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def stream_json(envelope, path, batches):
+    """
+    Yield ``envelope`` as JSON bytes with a list at ``path`` (a tuple of
+    keys) built from ``batches``, an iterable of lists of JSON-ready items.
+    """
+    target = envelope
+    for key in path[:-1]:
+        target = target[key]
+    target[path[-1]] = PLACEHOLDER
+    head, tail = dumps(envelope).split(dumps(PLACEHOLDER), 1)
+
+    yield (head + "[").encode()
+    first = True
+    for batch in batches:
+        if not batch:
+            continue
+        chunk = ",".join(dumps(item) for item in batch)
+        yield (chunk if first else "," + chunk).encode()
+        first = False
+    yield ("]" + tail).encode()
+
+
+class StreamingListMixin:
+    stream_chunk_size = None
+
+    def get_stream_chunk_size(self):
+        return self.stream_chunk_size or getattr(settings, "STREAM_CHUNK_SIZE", 500)
+
+    def serialize_batch(self, batch):
+        return self.get_serializer(batch, many=True).data
+
+    def stream_list(self, queryset, envelope, path, status_code=200):
+        """
+        Stream ``queryset`` into ``envelope`` at ``path``, serializing each
+        batch with ``serialize_batch``.
+        """
+        batches = (
+            self.serialize_batch(batch)
+            for batch in batched(queryset, self.get_stream_chunk_size())
+        )
+        return StreamingHttpResponse(
+            stream_json(envelope, path, batches),
+            status=status_code,
+            content_type="application/json",
+        )
@@ -0,0 +1,142 @@
+"""
+Keeps the normalized Tag table in step with the free-form ``tags`` strings
+on Blog and Community.
+
+The comma-separated string stays the source of truth for the API; every
+save splits it, links the post to one Tag row per name through
+``tag_set`` and adjusts the per-tag counters with atomic F() updates.
+
+A tag is identified by its normalized name (``Tag.key``: case-folded,
+whitespace collapsed), so "C", "C#" and "C++" stay three tags. Slugs are
+only for URLs: symbols slugify() would drop are spelled out ("c-sharp",
+"c-plus-plus") and a numeric suffix keeps the rest unique.
+"""
+from itertools import count
+
+from django.db import IntegrityError, transaction
+from django.db.models import F
+from django.utils.text import slugify
+
+from .models import Blog, Community, Tag
+from .utils import normalize_tag_key
+
+TAG_COUNT_FIELDS = {
+    Blog: "blog_count",
+    Community: "community_count",
+}
+
+SLUG_MAX_LENGTH = Tag._meta.get_field("slug").max_length
+
+# Characters that tell tags apart but slugify() would drop.
+SLUG_SYMBOLS = {
+    "+": " plus ",
+    "#": " sharp ",
+    "&": " and ",
+    "@": " at ",
+    ".": " dot ",
+}
+
+
+def parse_tags(raw):
+    """
+    Split a comma-separated tag string into unique (key, name) pairs,
+    keeping the first spelling seen for each key.
+    """
+    tags = {}
+    for name in (raw or "").split(","):
+        name = " ".join(name.split())[:100]
+        key = normalize_tag_key(name)
+        if key and key not in tags:
+            tags[key] = name
+    return tags
+
+
+def base_slug(name):
+    for symbol, word in SLUG_SYMBOLS.items():
+        name = name.replace(symbol, word)
+    return slugify(name)[:SLUG_MAX_LENGTH].strip("-") or "tag"
+
+
+def numbered_slug(base, number):
+    if number == 1:
+        return base
+    suffix = f"-{number}"
+    return base[:SLUG_MAX_LENGTH - len(suffix)].rstrip("-") + suffix
+
+
+def create_tag(key, name):
+    """
+    Id of the tag for ``key``, creating it under the first free slug.
+    """
+    base = base_slug(name)
+    taken = set(Tag.objects.filter(slug__startswith=base[:SLUG_MAX_LENGTH - 4]).values_list("slug", flat=True))
+    for number in count(1):
+        slug = numbered_slug(base, number)
+        if slug in taken:
+            continue
+        try:
+            with transaction.atomic():
+                return Tag.objects.create(name=name, slug=slug).id
+        except IntegrityError:
+            # Another worker created this tag, or took the slug, meanwhile.
+            tag_id = Tag.objects.filter(key=key).values_list("id", flat=True).first()
+            if tag_id is not None:
+                return tag_id
+            taken.add(slug)
+
+
+def get_or_create_tags(parsed):
+    """
+    Tag ids for the given {key: name} mapping, creating missing rows.
+    """
+    if not parsed:
+        return set()
+    existing = dict(Tag.objects.filter(key__in=parsed).values_list("key", "id"))
+    for key, name in parsed.items():
+        if key not in existing:
+            existing[key] = create_tag(key, name)
+    return set(existing.values())
+
+
+def adjust_counts(model, tag_ids, delta):
+    if not tag_ids:
+        return
+    field = TAG_COUNT_FIELDS[model]
+    Tag.objects.filter(id__in=tag_ids).update(**{field: F(field) + delta})
+
+
+def sync_tags(instance):
+    """
+    Point ``instance.tag_set`` at the tags in ``instance.tags``.
+    """
+    model = type(instance)
+    wanted = get_or_create_tags(parse_tags(instance.tags))
+    current = set(instance.tag_set.values_list("id", flat=True))
+
+    added = wanted - current
+    removed = current - wanted
+    if added:
+        instance.tag_set.add(*added)
+        adjust_counts(model, added, 1)
+    if removed:
+        instance.tag_set.remove(*removed)
+        adjust_counts(model, removed, -1)
+
+
+def release_tags(instance):
+    """
+    Decrement the counters of every tag on a post that is about to be deleted.
+    """
+    adjust_counts(type(instance), list(instance.tag_set.values_list("id", flat=True)), -1)
+
+
+def filter_by_tag(queryset, tag):
+    """
+    Restrict a Blog/Community queryset to posts carrying ``tag`` (name or slug).
+    """
+    tag_id = Tag.objects.filter(key=normalize_tag_key(tag)).values_list("id", flat=True).first()
+    if tag_id is None:
+        tag_id = Tag.objects.filter(slug=tag).values_list("id", flat=True).first()
+    if tag_id is None:
+        return queryset.none()
+    return queryset.filter(tag_set=tag_id)
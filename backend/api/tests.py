@@ -1,3 +1,208 @@
-from django.test import TestCase
+import smtplib
+from datetime import timedelta
 
-# Create your tests here.
+from django.contrib.auth import authenticate
+from django.core import mail
+from django.core.mail.backends.locmem import EmailBackend
+from django.db import IntegrityError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.serializers import ValidationError
+from rest_framework.test import APITestCase
+
+from .models import Author, Blog, Comment, Community, OutboundEmail, User
+from .outbox import drain, enqueue_email
+from .search import search_posts
+from .serializers import PasswordResetSerializer, UserSerializer
+
+
+class AuthLookupIndexTests(TestCase):
+    """
+    The auth and signup lookups on api_user must be index searches, never
+    table scans. Each test runs EXPLAIN QUERY PLAN on the SQL the code
+    actually issued.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(
+            username="alice", email="Alice@Example.com", password="correct horse battery"
+        )
+
+    def user_query_plans(self, func):
+        with CaptureQueriesContext(connection) as queries:
+            func()
+        plans = []
+        with connection.cursor() as cursor:
+            for query in queries.captured_queries:
+                sql = query["sql"]
+                if sql.startswith("SELECT") and '"api_user"' in sql:
+                    cursor.execute(f"EXPLAIN QUERY PLAN {sql}")
+                    plans.append(" ".join(row[-1] for row in cursor.fetchall()))
+        self.assertTrue(plans, "no api_user lookups were issued")
+        return plans
+
+    def assertIndexSearch(self, func, term):
+        for plan in self.user_query_plans(func):
+            self.assertIn("SEARCH api_user USING", plan)
+            self.assertIn(term, plan)
+            self.assertNotIn("SCAN api_user", plan)
+
+    def test_login_uses_unique_email_index(self):
+        self.assertIndexSearch(
+            lambda: self.assertEqual(
+                authenticate(email=" ALICE@example.com", password="correct horse battery"), self.user
+            ),
+            "(email_normalized=?)",
+        )
+
+    def test_signup_email_check_uses_unique_email_index(self):
+        serializer = UserSerializer()
+        self.assertIndexSearch(
+            lambda: self.assertRaises(ValidationError, serializer.validate_email, "alice@EXAMPLE.com"),
+            "(email_normalized=?)",
+        )
+
+    def test_signup_username_check_uses_lower_username_index(self):
+        serializer = UserSerializer()
+        self.assertIndexSearch(
+            lambda: self.assertRaises(ValidationError, serializer.validate_username, "ALICE"),
+            "user_username_lower_idx",
+        )
+
+    def test_password_reset_email_check_uses_unique_email_index(self):
+        serializer = PasswordResetSerializer()
+        self.assertIndexSearch(
+            lambda: self.assertEqual(serializer.validate_email("ALICE@example.com"), "alice@example.com"),
+            "(email_normalized=?)",
+        )
+
+    def test_email_is_unique_case_insensitively(self):
+        duplicate = User(username="alice2", email="alice@example.COM")
+        with self.assertRaises(IntegrityError):
+            duplicate.save()
+
+    def test_users_without_email_do_not_collide(self):
+        User.objects.create_user(username="noemail1", email="")
+        User.objects.create_user(username="noemail2", email="")
+        self.assertIsNone(authenticate(email="", password=""))
+
+
+class CommentReactionTests(APITestCase):
+    """
+    One like per client, however the client dresses up its requests.
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        author = Author.objects.create(name="Alice", email="alice@example.com")
+        blog = Blog.objects.create(
+            title="Post", description="d", content="c", author=author, category="news", tags=""
+        )
+        cls.comment = Comment.objects.create(name="Bob", message="Hi", blog=blog)
+
+    def like(self, **headers):
+        response = self.client.post(f"/api/comments/{self.comment.pk}/like/", **headers)
+        self.assertEqual(response.status_code, 200)
+        return response.data["data"]["likes"]
+
+    def test_changing_user_agent_does_not_like_again(self):
+        self.assertEqual(self.like(HTTP_USER_AGENT="Browser/1"), 1)
+        self.assertEqual(self.like(HTTP_USER_AGENT="Browser/2"), 1)
+        self.assertEqual(self.like(), 1)
+
+
+class SearchHighlightTests(TestCase):
+    def setUp(self):
+        self.author = Author.objects.create(name="Mallory", email="mallory@example.com")
+
+    def post(self, title, content):
+        Community.objects.create(
+            title=title, description="d", content=content, author=self.author, category="general", tags=""
+        )
+
+    def test_title_markup_is_escaped_around_matches(self):
+        self.post("<img src=x onerror=alert(1)> Hello", "Nothing to see")
+        results, _ = search_posts("hello")
+        self.assertEqual(results[0]["title"], "&lt;img src=x onerror=alert(1)&gt; <mark>Hello</mark>")
+
+    def test_snippet_markup_is_escaped_around_matches(self):
+        self.post("Greetings", 'Hello <script>alert("xss")</script> world')
+        results, _ = search_posts("hello")
+        snippet = results[0]["snippet"]
+        self.assertNotIn("<script>", snippet)
+        self.assertIn("&lt;script&gt;", snippet)
+        self.assertIn("<mark>Hello</mark>", snippet)
+
+
+class FlakyBackend(EmailBackend):
+    """
+    locmem backend that can refuse connections, drop them mid-batch, or
+    reject single recipients, like a misbehaving SMTP server.
+    """
+
+    def __init__(self, refuse_connect=False, drop_after=None, reject=(), **kwargs):
+        super().__init__(**kwargs)
+        self.refuse_connect = refuse_connect
+        self.drop_after = drop_after
+        self.reject = set(reject)
+
+    def open(self):
+        if self.refuse_connect:
+            raise ConnectionRefusedError("Connection refused")
+        return super().open()
+
+    def send_messages(self, messages):
+        for message in messages:
+            if self.drop_after is not None and len(mail.outbox) >= self.drop_after:
+                self.refuse_connect = True
+                raise smtplib.SMTPServerDisconnected("Connection unexpectedly closed")
+            if self.reject & set(message.to):
+                raise smtplib.SMTPRecipientsRefused({address: (550, b"No such user") for address in message.to})
+        return super().send_messages(messages)
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2)
+class OutboxTests(TestCase):
+    def setUp(self):
+        self.emails = [enqueue_email("Hi", "Body", f"user{n}@example.com") for n in range(3)]
+
+    def statuses(self):
+        return list(OutboundEmail.objects.order_by("id").values_list("status", "attempts"))
+
+    def make_due(self):
+        OutboundEmail.objects.update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+
+    def test_sends_and_marks_each_message(self):
+        self.assertEqual(drain(FlakyBackend()), (3, 0))
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(self.statuses(), [(OutboundEmail.SENT, 1)] * 3)
+
+    def test_outage_defers_without_using_attempts(self):
+        for _ in range(5):
+            self.assertEqual(drain(FlakyBackend(refuse_connect=True)), (0, 0))
+            self.make_due()
+        self.assertEqual(self.statuses(), [(OutboundEmail.PENDING, 0)] * 3)
+        self.assertEqual(drain(FlakyBackend()), (3, 0))
+
+    def test_deferred_messages_wait_for_the_retry_delay(self):
+        drain(FlakyBackend(refuse_connect=True))
+        self.assertEqual(drain(FlakyBackend()), (0, 0))
+
+    def test_connection_lost_mid_batch_keeps_what_was_sent(self):
+        self.assertEqual(drain(FlakyBackend(drop_after=1)), (1, 0))
+        self.assertEqual(
+            self.statuses(),
+            [(OutboundEmail.SENT, 1), (OutboundEmail.PENDING, 0), (OutboundEmail.PENDING, 0)],
+        )
+
+    def test_rejected_message_uses_attempts_until_failed(self):
+        backend = FlakyBackend(reject={"user1@example.com"})
+        self.assertEqual(drain(backend), (2, 1))
+        self.make_due()
+        self.assertEqual(drain(backend), (0, 1))
+        self.assertEqual(
+            self.statuses(),
+            [(OutboundEmail.SENT, 1), (OutboundEmail.FAILED, 2), (OutboundEmail.SENT, 1)],
+        )
@@ -0,0 +1,169 @@
+"""
+Token-bucket throttling shared by all gunicorn workers.
+
+Bucket state lives in a memory-mapped file (THROTTLE_STATE_FILE) laid out
+as a fixed hash table of THROTTLE_SLOTS slots, each holding a key hash,
+the remaining tokens and the time they were counted. A key hashes to a
+group of PROBE_SLOTS adjacent slots; checking it locks just that group
+(fcntl byte-range lock) and touches nothing else, so a check costs the
+same however many clients are tracked. When a group is full the least
+recently used slot is reused, which at worst hands that client a fresh
+bucket.
+
+SharedBucketThrottle applies two buckets to every unsafe request: the
+client's overall "ip" bucket and one for the view's ``throttle_scope``.
+Limits are configured in THROTTLE_BUCKETS as (rate, burst), where rate
+is a DRF-style "number/period" refill rate and burst the bucket size.
+Rejected requests get 429 with Retry-After.
+"""
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework.throttling import BaseThrottle
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+HEADER = struct.Struct("<4sII")
+MAGIC = b"TBKT"
+SLOT = struct.Struct("<Qdd")
+PROBE_SLOTS = 4
+PERIODS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_rate(rate):
+    """
+    Tokens per second for a "number/period" rate such as "10/min".
+    """
+    num, period = rate.split("/")
+    return int(num) / PERIODS[period[0]]
+
+
+def key_hash(key):
+    value = int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+    return value or 1  # 0 marks an empty slot
+
+
+class SharedBuckets:
+    def __init__(self, path=None, slots=None):
+        self.path = path
+        self.slots = slots
+        self._lock = threading.Lock()
+        self._map = None
+        self._fd = None
+        self._pid = None
+
+    def _open(self):
+        if self._map is not None:
+            self._map.close()
+            os.close(self._fd)
+        path = str(self.path or getattr(settings, "THROTTLE_STATE_FILE"))
+        slots = self.slots or getattr(settings, "THROTTLE_SLOTS", 65536)
+        slots -= slots % PROBE_SLOTS
+        size = HEADER.size + slots * SLOT.size
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        self._file_lock(fd, 0, HEADER.size)
+        try:
+            # Never shrink the file: other workers may still have it mapped.
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self._map = mmap.mmap(fd, size)
+            if HEADER.unpack_from(self._map, 0) != (MAGIC, SLOT.size, slots):
+                # New file or a different layout: start from empty buckets.
+                self._map[:] = bytes(size)
+                HEADER.pack_into(self._map, 0, MAGIC, SLOT.size, slots)
+        finally:
+            self._file_unlock(fd, 0, HEADER.size)
+        self._fd = fd
+        self._groups = slots // PROBE_SLOTS
+        self._pid = os.getpid()
+
+    def _file_lock(self, fd, offset, length):
+        if fcntl is not None:
+            fcntl.lockf(fd, fcntl.LOCK_EX, length, offset)
+
+    def _file_unlock(self, fd, offset, length):
+        if fcntl is not None:
+            fcntl.lockf(fd, fcntl.LOCK_UN, length, offset)
+
+    def take(self, key, rate, burst):
+        """
+        Take one token from ``key``'s bucket. Returns 0 when allowed,
+        otherwise the seconds until a token is available.
+        """
+        digest = key_hash(key)
+        # fcntl locks belong to the process, so threads also need a lock.
+        with self._lock:
+            if self._pid != os.getpid():
+                self._open()
+            start = HEADER.size + (digest % self._groups) * PROBE_SLOTS * SLOT.size
+            length = PROBE_SLOTS * SLOT.size
+            self._file_lock(self._fd, start, length)
+            try:
+                return self._take(start, digest, rate, burst)
+            finally:
+                self._file_unlock(self._fd, start, length)
+
+    def _take(self, start, digest, rate, burst):
+        now = time.time()
+        found = free = lru = None
+        for offset in range(start, start + PROBE_SLOTS * SLOT.size, SLOT.size):
+            slot_key, tokens, updated = SLOT.unpack_from(self._map, offset)
+            if slot_key == digest:
+                found = offset
+                break
+            if slot_key == 0:
+                free = offset if free is None else free
+            elif lru is None or updated < lru[1]:
+                lru = (offset, updated)
+
+        if found is not None:
+            tokens = min(burst, tokens + max(0.0, now - updated) * rate)
+        else:
+            found = free if free is not None else lru[0]
+            tokens = float(burst)
+
+        if tokens >= 1:
+            SLOT.pack_into(self._map, found, digest, tokens - 1, now)
+            return 0
+        SLOT.pack_into(self._map, found, digest, tokens, now)
+        return (1 - tokens) / rate
+
+
+shared_buckets = SharedBuckets()
+
+
+class SharedBucketThrottle(BaseThrottle):
+    """
+    Per-client token buckets for unsafe requests: one across all throttled
+    views ("ip") and one for the view's ``throttle_scope``.
+    """
+
+    def get_buckets(self, view):
+        configured = getattr(settings, "THROTTLE_BUCKETS", {})
+        scopes = ["ip", getattr(view, "throttle_scope", None)]
+        return [(scope, configured[scope]) for scope in scopes if scope in configured]
+
+    def allow_request(self, request, view):
+        self._wait = None
+        if request.method in SAFE_METHODS:
+            return True
+        ident = self.get_ident(request)
+        for scope, (rate, burst) in self.get_buckets(view):
+            wait = shared_buckets.take(f"{scope}|{ident}", parse_rate(rate), burst)
+            if wait:
+                self._wait = wait
+                return False
+        return True
+
+    def wait(self):
+        return self._wait
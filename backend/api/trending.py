@@ -0,0 +1,86 @@
+"""
+Time-decayed trending scores for blogs and community posts.
+
+A post's score is the base-2 log of the sum of its events (views,
+comments, publication), each weighted by 2 ** ((event_time -
+TRENDING_EPOCH) / half_life). Growing the weight of new events instead of
+shrinking old ones means comparing two scores already gives the decayed
+order, so nothing has to be recomputed as time passes. Keeping the sum in
+log space keeps scores small (they grow by one per half-life) where the
+raw sum would overflow a float within a few years; adding an event is
+still one atomic UPDATE, ``score = log2(2 ** score + 2 ** event)``
+computed as ``max + log2(1 + 2 ** -|score - event|)``. The (category,
+trending_score) indexes make the top-K read an index scan of K rows
+instead of a sort of the table.
+
+``manage.py rebuild_trending`` recomputes scores from scratch, which is
+needed after changing TRENDING_HALF_LIFE_HOURS.
+"""
+import math
+from datetime import datetime, timezone
+
+from django.conf import settings
+from django.db.models import Count, F, FloatField, Value
+from django.db.models.functions import Abs, Greatest, Log, Power
+from django.utils.timezone import now
+
+TRENDING_EPOCH = datetime(2025, 1, 1, tzinfo=timezone.utc)
+
+VIEW_WEIGHT = 1.0
+COMMENT_WEIGHT = 5.0
+NEW_POST_WEIGHT = 20.0
+
+
+def event_score(weight, at=None):
+    """log2 of the weight of an event happening at ``at``, relative to the epoch."""
+    at = at or now()
+    half_life = getattr(settings, "TRENDING_HALF_LIFE_HOURS", 72) * 3600
+    return math.log2(weight) + (at - TRENDING_EPOCH).total_seconds() / half_life
+
+
+def log2_add(a, b):
+    """log2(2 ** a + 2 ** b) without leaving log space."""
+    return max(a, b) + math.log2(1 + 2 ** -abs(a - b))
+
+
+def score_increment(weight, at=None):
+    event = Value(event_score(weight, at), output_field=FloatField())
+    score = F("trending_score")
+    return Greatest(score, event) + Log(2, 1 + Power(2, -Abs(score - event)))
+
+
+def bump(model, pk, weight, at=None):
+    model.objects.filter(pk=pk).update(trending_score=score_increment(weight, at))
+
+
+def seed(model, pk, weight, at=None):
+    """Start a new post's score at its first event."""
+    model.objects.filter(pk=pk).update(trending_score=event_score(weight, at))
+
+
+def top_posts(model, category=None, limit=5):
+    queryset = model.objects.order_by("-trending_score", "-id")
+    if category:
+        queryset = queryset.filter(category=category)
+    return queryset[:limit]
+
+
+def rebuild_scores(model):
+    """
+    Recompute every score of ``model`` from its totals.
+
+    Per-event timestamps are not stored, so views and comments are
+    credited at publication time. Returns the number of rows updated.
+    """
+    batch = []
+    annotate = {}
+    if hasattr(model, "comments"):
+        annotate["comment_total"] = Count("comments")
+    queryset = model.objects.annotate(**annotate).only("id", "date", "views")
+    for post in queryset.iterator(chunk_size=500):
+        weight = NEW_POST_WEIGHT + post.views * VIEW_WEIGHT
+        weight += getattr(post, "comment_total", 0) * COMMENT_WEIGHT
+        post.trending_score = event_score(weight, post.date)
+        batch.append(post)
+    model.objects.bulk_update(batch, ["trending_score"], batch_size=500)
+    return len(batch)
@@ -1,3 +1,7 @@
+from urllib.parse import urljoin
+
+from django.conf import settings
+from django.core.files.storage import default_storage
 from rest_framework.response import Response
 
 def custom_response(success=True, message="", data=None, status_code=200):
@@ -9,3 +13,20 @@ def custom_response(success=True, message="", data=None, status_code=200):
         },
         status=status_code
     )
+
+
+def absolute_media_url(name):
+    """Full URL for a stored file name, matching the serializers' get_cover_image."""
+    if not name:
+        return None
+    return urljoin(settings.SITE_DOMAIN, default_storage.url(name).lstrip('/'))
+
+
+def normalize_email_key(email):
+    """Lowercased, trimmed email used for indexed case-insensitive lookups."""
+    return (email or '').strip().lower()
+
+
+def normalize_tag_key(name):
+    """Case-folded name with collapsed whitespace that identifies a Tag."""
+    return ' '.join((name or '').split()).casefold()[:100]
@@ -1,24 +1,37 @@
 from rest_framework import status, generics, permissions
 from rest_framework.response import Response
 from rest_framework.views import APIView
-from django.core.mail import send_mail
 from .models import *
-from .utils import custom_response 
+from .utils import custom_response, normalize_email_key
+from .snapshots import BLOG_DATA, COMMUNITY_DATA, snapshot_response
+from .pagination import KeysetPagination, CommentPagination, encode_cursor, decode_cursor
+from .comments import load_threads, thread_replies_page
+from .search import search_posts
+from .counters import view_counter
+from .trending import top_posts
+from .rollups import rollup_by_category, rollup_series, rollup_total
+from .reactions import COUNTER_FIELDS, apply_reactions, client_fingerprint
+from .tags import filter_by_tag
+from .response_cache import CachedResponseMixin
+from .streaming import StreamingListMixin
+from .outbox import enqueue_email
+from .throttling import SharedBucketThrottle
+from .hashers import password_check_slot
+from .conditional import ConditionalGetMixin, list_validators, post_metadata, post_validators
 from django.shortcuts import get_object_or_404
 from rest_framework import generics, permissions, status
 from rest_framework.response import Response
 from django.contrib.auth import get_user_model
 from .serializers import *
-from rest_framework_simplejwt.views import TokenObtainPairView
-from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 from django.utils.http import urlsafe_base64_decode
 from django.utils.encoding import force_str
 from django.shortcuts import redirect
 from django.conf import settings
 from django.contrib.auth.tokens import default_token_generator
 import json
-from django.db.models.functions import TruncMonth
-from django.db.models import Count
+from django.utils.dateparse import parse_date
+from django.db.models import F
 from django.utils.timezone import now
 
 
@@ -42,14 +55,17 @@ class UserCreateView(generics.CreateAPIView):
     serializer_class = UserSerializer
     authentication_classes = []
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'register'
 
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
-        user.send_verification_email()
-        
-        refresh = RefreshToken.for_user(user)
+        # User.save() queues the verification email.
+        with password_check_slot():
+            user = serializer.save()
+
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
         
         return standard_response(
             status=True,
@@ -70,14 +86,18 @@ class CustomTokenObtainPairView(TokenObtainPairView):
     Authenticate user using email and return JWT tokens with user data
     """
     serializer_class = CustomTokenObtainPairSerializer
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'login'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
 
-        try:
-            serializer.is_valid(raise_exception=True)
-        except Exception as e:
-            return Response({"status": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        # Checking the password is the slow part; cap how many run at once.
+        with password_check_slot():
+            try:
+                serializer.is_valid(raise_exception=True)
+            except Exception as e:
+                return Response({"status": False, "message": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
         data = serializer.validated_data
         user_data = data.pop("user", {})  # remove user data from token section
@@ -91,7 +111,33 @@ class CustomTokenObtainPairView(TokenObtainPairView):
             }
         }, status=status.HTTP_200_OK)
     
-class UserProfileView(generics.RetrieveUpdateAPIView):
+class CustomTokenRefreshView(TokenRefreshView):
+    """
+    Exchange a refresh token that has not been revoked for a new access token
+    """
+    serializer_class = CustomTokenRefreshSerializer
+
+
+class LogoutView(generics.GenericAPIView):
+    """
+    Revoke a refresh token and the access token sent with the request
+    """
+    serializer_class = LogoutSerializer
+    permission_classes = [permissions.AllowAny]
+
+    def post(self, request, *args, **kwargs):
+        serializer = self.get_serializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        serializer.save()
+
+        return standard_response(
+            status=True,
+            message="Logged out successfully",
+            status_code=status.HTTP_200_OK
+        )
+
+
+class CurrentUserProfileView(generics.RetrieveUpdateAPIView):
     """
     Get or update authenticated user's profile
     """
@@ -99,7 +145,8 @@ class UserProfileView(generics.RetrieveUpdateAPIView):
     permission_classes = [permissions.IsAuthenticated]
 
     def get_object(self):
-        return self.request.user
+        # request.user only carries the token claims; load the row (cached).
+        return self.request.user.get_user()
 
     def retrieve(self, request, *args, **kwargs):
         instance = self.get_object()
@@ -129,6 +176,8 @@ class PasswordResetView(generics.GenericAPIView):
     """
     serializer_class = PasswordResetSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
@@ -147,14 +196,17 @@ class PasswordResetConfirmView(generics.GenericAPIView):
     """
     serializer_class = PasswordResetConfirmSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'password_reset'
 
     def post(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         serializer.is_valid(raise_exception=True)
-        user = serializer.save()
+        with password_check_slot():
+            user = serializer.save()
         
         # Generate new tokens after password reset
-        refresh = RefreshToken.for_user(user)
+        refresh = CustomTokenObtainPairSerializer.get_token(user)
         
         return standard_response(
             status=True,
@@ -194,7 +246,7 @@ class EmailVerificationView(generics.GenericAPIView):
         if user is not None and default_token_generator.check_token(user, token):
             user.email_verified = True
             user.save()
-            refresh = RefreshToken.for_user(user)
+            refresh = CustomTokenObtainPairSerializer.get_token(user)
             return redirect(
                 f'{settings.FRONTEND_URL}/login?'
                 f'verified=true&'
@@ -211,6 +263,8 @@ class NewsletterSignupView(generics.CreateAPIView):
     queryset = NewsletterSubscriber.objects.all()
     serializer_class = NewsletterSubscriberSerializer
     permission_classes = [permissions.AllowAny] 
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'newsletter'
 
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
@@ -225,6 +279,8 @@ class ContactFormView(generics.CreateAPIView):
     queryset = ContactMessage.objects.all()
     serializer_class = ContactMessageSerializer
     permission_classes = [permissions.AllowAny] 
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'contact'
 
     def create(self, request, *args, **kwargs):
         response = super().create(request, *args, **kwargs)
@@ -238,6 +294,8 @@ class ContactFormView(generics.CreateAPIView):
 class SendCustomEmailView(APIView):
     
     permission_classes = [permissions.AllowAny] 
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'send_email'
 
     def post(self, request):
         subject = request.data.get('subject')
@@ -251,7 +309,7 @@ class SendCustomEmailView(APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        send_mail(subject, message, 'your_email@example.com', recipient_list)
+        enqueue_email(subject, message, recipient_list)
 
         return custom_response(
             success=True,
@@ -259,17 +317,17 @@ class SendCustomEmailView(APIView):
         )
 
 
-class AuthorListCreateView(generics.ListCreateAPIView):
+class AuthorListCreateView(StreamingListMixin, generics.ListCreateAPIView):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     permission_classes = [permissions.AllowAny] 
 
     def list(self, request, *args, **kwargs):
-        response = super().list(request, *args, **kwargs)
-        return custom_response(
-            success=True,
-            message="Authors retrieved successfully",
-            data=response.data
+        # Streamed in batches rather than built in memory
+        return self.stream_list(
+            self.filter_queryset(self.get_queryset()),
+            {"success": True, "message": "Authors retrieved successfully", "data": None},
+            ("data",),
         )
 
     def create(self, request, *args, **kwargs):
@@ -283,10 +341,12 @@ class AuthorListCreateView(generics.ListCreateAPIView):
 
 
 
-class AuthorDetailView(generics.RetrieveUpdateDestroyAPIView):
+class AuthorDetailView(CachedResponseMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Author.objects.all()
     serializer_class = AuthorSerializer
     permission_classes = [permissions.AllowAny] 
+    cache_ttl = 300
+    cache_depends_on = (Author,)
 
     def retrieve(self, request, *args, **kwargs):
         response = super().retrieve(request, *args, **kwargs)
@@ -313,16 +373,37 @@ class AuthorDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
 
 
-class BlogListCreateView(generics.ListCreateAPIView):
-    queryset = Blog.objects.all()
+class BlogListCreateView(CachedResponseMixin, ConditionalGetMixin, generics.ListCreateAPIView):
+    queryset = Blog.objects.select_related('author')
     # serializer_class = BlogSerializer
     permission_classes = [permissions.AllowAny] 
+    # Comment saves move the comment counters shown in the list.
+    cache_depends_on = (Blog, Author, Comment)
+    pagination_class = KeysetPagination  # opt-in via ?cursor= / ?page_size=
+    # ?ordering= values for the unpaginated list, backed by denormalized counters
+    orderings = {
+        'activity': (F('last_comment_at').desc(nulls_last=True), '-id'),
+        'comments': ('-comment_count', '-id'),
+    }
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return BlogCreateUpdateSerializer
         return BlogSerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tag = self.request.query_params.get('tag')
+        if tag:
+            queryset = filter_by_tag(queryset, tag)
+        ordering = self.orderings.get(self.request.query_params.get('ordering'))
+        if ordering:
+            queryset = queryset.order_by(*ordering)
+        return queryset
+
+
+    def get_validators(self, request, *args, **kwargs):
+        return list_validators(self, self.cache_depends_on)
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -352,7 +433,7 @@ class BlogListCreateView(generics.ListCreateAPIView):
             status_code=status.HTTP_201_CREATED
         )
 
-class BlogDetailView(generics.RetrieveUpdateDestroyAPIView):
+class BlogDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Blog.objects.all()
     # serializer_class = BlogSerializer
     permission_classes = [permissions.AllowAny] 
@@ -366,16 +447,27 @@ class BlogDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return get_object_or_404(Blog, slug=self.kwargs["slug"])  # Now it will work
 
+    def get_validators(self, request, *args, **kwargs):
+        self.metadata = post_metadata(
+            Blog.objects.filter(slug=kwargs["slug"]), "comment_count", "thread_count", "last_comment_at"
+        )
+        return post_validators(self.metadata)
+
+    def not_modified(self, request, *args, **kwargs):
+        # A revalidated visit is still a view.
+        view_counter.increment(Blog, self.metadata["pk"])
+
     def retrieve(self, request, *args, **kwargs):
         blog = self.get_object()
-        blog.views += 1
-        blog.save(update_fields=["views"])
-        
-        response = super().retrieve(request, *args, **kwargs)
+        # Show the view count including increments not flushed yet.
+        blog.views += view_counter.pending(Blog, blog.pk) + 1
+        view_counter.increment(Blog, blog.pk)
+
+        serializer = self.get_serializer(blog)
         return custom_response(
             success=True,
             message="Blog retrieved successfully",
-            data=response.data
+            data=serializer.data
         )
 
     def update(self, request, *args, **kwargs):
@@ -395,10 +487,16 @@ class BlogDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
 
     
-class PopularBlogsView(generics.ListAPIView):
-    queryset = Blog.objects.all().order_by("-views")[:5]
+class PopularBlogsView(CachedResponseMixin, generics.ListAPIView):
+    """
+    Top 5 trending blogs, optionally within ?category=.
+    """
     serializer_class = BlogSerializer
     permission_classes = [permissions.AllowAny]
+    cache_depends_on = (Blog, Author)
+
+    def get_queryset(self):
+        return top_posts(Blog, category=self.request.query_params.get("category")).select_related("author")
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -409,90 +507,127 @@ class PopularBlogsView(generics.ListAPIView):
         )
 
 class BlogDataView(APIView):
+    """
+    Serves the precomputed blog-data snapshot (see api/snapshots.py).
+    """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        # Get all unique categories from Blog model
-        categories = Blog.objects.values_list("category", flat=True).distinct()
+        return snapshot_response(request, BLOG_DATA)
 
-        # Get all blogs
-        blogs = Blog.objects.all().order_by('-date')  # Latest blogs first
-        serialized_blogs = BlogSerializer(blogs, many=True).data
 
-        # Format blog list
-        blog_list = [
-            {
-                "id": blog["id"],
-                "title": blog["title"],
-                "description": blog["description"][:100],
-                "image": blog["cover_image"],
-                "category": blog["category"],
-                "slug": blog["slug"],
-                "views": blog["views"],
-            }
-            for blog in serialized_blogs
-        ]
+class SearchView(CachedResponseMixin, APIView):
+    """
+    Full-text search over blogs and community posts.
 
-        # Fetch top 5 most popular blogs by views
-        popular_blogs = Blog.objects.all().order_by('-views')[:5]
-        popular_posts = [
-            {"id": blog.id, "title": blog.title, "slug": blog.slug, "link": f"/blog/{blog.slug}/"}
-            for blog in popular_blogs
-        ]
+    Query params: q (required), type=blog|community, cursor, page_size.
+    """
+    permission_classes = [permissions.AllowAny]
+    cache_depends_on = (Blog, Community)
 
-        # Dynamic Sidebar Content
-        sidebar_content = {
-            "popularPosts": popular_posts,
-            "tags": Blog.objects.values_list("tags", flat=True).distinct(),  # Get unique tags
-        }
+    def get(self, request):
+        query = request.query_params.get("q", "").strip()
+        kind = request.query_params.get("type")
+        if not query:
+            return custom_response(
+                success=False,
+                message="Missing search query",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        if kind not in (None, "blog", "community"):
+            return custom_response(
+                success=False,
+                message="type must be 'blog' or 'community'",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Construct response
-        blogData = {
-            "categories": list(categories),
-            "blogs": blog_list,
-            "sidebarContent": sidebar_content,
-        }
+        paginator = KeysetPagination()
+        after = None
+        cursor = request.query_params.get(paginator.cursor_query_param)
+        if cursor:
+            try:
+                payload = decode_cursor(cursor)
+                after = (float(payload["r"]), int(payload["i"]))
+            except (TypeError, ValueError, KeyError):
+                return custom_response(
+                    success=False,
+                    message="Invalid cursor",
+                    status_code=status.HTTP_400_BAD_REQUEST
+                )
 
-        return Response(blogData, status=200)
+        results, last = search_posts(query, kind=kind, limit=paginator.get_page_size(request), after=after)
+        return custom_response(
+            success=True,
+            message="Search results retrieved successfully",
+            data={
+                "next": encode_cursor({"r": last[0], "i": last[1]}) if last else None,
+                "results": results,
+            }
+        )
 
 
-class CommentListCreateView(APIView):
+class CommentListCreateView(StreamingListMixin, APIView):
     """
     List all comments for a specific blog or create a new comment.
+
+    The unpaginated list of every thread (no postId) is streamed.
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'comments'
+
+    def format_threads(self, roots):
+        serialized_comments = CommentSerializer(roots, many=True).data
+
+        # Format comments to ensure a clean response
+        return [
+            {
+                "id": comment["id"],
+                "name": comment["name"],
+                "message": comment["message"],
+                "blog": comment["blog"],
+                "likes": comment["likes"],
+                "dislikes": comment["dislikes"],
+                "created_at": comment["created_at"],
+                "parent": comment["parent"],
+                "replies": comment["replies"],  # Ensure nested replies are included
+                "reply_count": root.reply_count,
+                "replies_cursor": (
+                    encode_cursor({"p": root.last_reply_path}) if root.has_more_replies else None
+                ),
+            }
+            for comment, root in zip(serialized_comments, roots)
+        ]
+
+    def serialize_batch(self, batch):
+        return self.format_threads(load_threads(batch))
 
     def get(self, request, postId=None):
         try:
-            # Filter comments by blog ID if postId is provided
+            # Top-level comments only; replies are nested under their thread
+            roots = Comment.objects.filter(depth=0).order_by('-created_at', '-id')
             if postId:
-                comments = Comment.objects.filter(blog=postId).order_by('-created_at')
-            else:
-                comments = Comment.objects.all().order_by('-created_at')
-
-            serialized_comments = CommentSerializer(comments, many=True).data
-
-            # Format comments to ensure a clean response
-            comment_list = [
-                {
-                    "id": comment["id"],
-                    "name": comment["name"],
-                    "message": comment["message"],
-                    "blog": comment["blog"],
-                    "likes": comment["likes"],
-                    "dislikes": comment["dislikes"],
-                    "created_at": comment["created_at"],
-                    "parent": comment["parent"],
-                    "replies": comment["replies"],  # Ensure nested replies are included
-                }
-                for comment in serialized_comments
-            ]
+                roots = roots.filter(blog=postId)
+
+            # Opt-in cursor pagination of threads via ?cursor= / ?page_size=
+            paginator = CommentPagination()
+            page = paginator.paginate_queryset(roots, request, view=self)
+            if page is None and not postId:
+                return self.stream_list(
+                    roots,
+                    {"message": "Comments fetched successfully", "data": {"comments": None}, "status": status.HTTP_200_OK},
+                    ("data", "comments"),
+                )
+
+            comment_list = self.format_threads(load_threads(page if page is not None else roots))
+
+            data = {"comments": comment_list}
+            if page is not None:
+                data.update(next=paginator.next_cursor, previous=paginator.previous_cursor)
 
             response_data = {
                 "message": "Comments fetched successfully",
-                "data": {
-                    "comments": comment_list,
-                },
+                "data": data,
                 "status": status.HTTP_200_OK,
             }
             return Response(response_data, status=status.HTTP_200_OK)
@@ -529,6 +664,45 @@ class CommentListCreateView(APIView):
             )
 
 
+class CommentRepliesView(APIView):
+    """
+    Load more replies of a thread, in depth-first order.
+    """
+    permission_classes = [permissions.AllowAny]
+
+    def get(self, request, pk):
+        try:
+            root = Comment.objects.get(pk=pk, depth=0)
+        except Comment.DoesNotExist:
+            return Response(
+                {"message": "Comment not found", "status": status.HTTP_404_NOT_FOUND},
+                status=status.HTTP_404_NOT_FOUND,
+            )
+
+        after_path = None
+        cursor = request.query_params.get("cursor")
+        if cursor:
+            try:
+                after_path = str(decode_cursor(cursor)["p"])
+            except (ValueError, KeyError):
+                return Response(
+                    {"message": "Invalid cursor", "status": status.HTTP_400_BAD_REQUEST},
+                    status=status.HTTP_400_BAD_REQUEST,
+                )
+
+        limit = CommentPagination().get_page_size(request)
+        replies, next_path = thread_replies_page(root, after_path=after_path, limit=limit)
+        response_data = {
+            "message": "Replies fetched successfully",
+            "data": {
+                "replies": CommentSerializer(replies, many=True).data,
+                "next": encode_cursor({"p": next_path}) if next_path else None,
+            },
+            "status": status.HTTP_200_OK,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
+
+
 class CommentDetailView(APIView):
     """
     Retrieve, update, or delete a single comment.
@@ -596,63 +770,101 @@ class CommentDetailView(APIView):
 
 class CommentLikeView(APIView):
     """
-    Like a comment.
+    Like a comment (once per client).
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'reactions'
+    kind = CommentReaction.LIKE
+    message = "Comment liked successfully"
 
     def post(self, request, pk):
-        try:
-            comment = Comment.objects.get(pk=pk)
-            comment.likes += 1
-            comment.save()
-            response_data = {
-                "message": "Comment liked successfully",
-                "data": {"likes": comment.likes},
-                "status": status.HTTP_200_OK,
-            }
-            return Response(response_data, status=status.HTTP_200_OK)
-        except Comment.DoesNotExist:
+        counts = apply_reactions(client_fingerprint(request), [(pk, self.kind)])
+        if pk not in counts:
             return Response(
                 {"message": "Comment not found", "status": status.HTTP_404_NOT_FOUND},
                 status=status.HTTP_404_NOT_FOUND,
             )
+        field = COUNTER_FIELDS[self.kind]
+        response_data = {
+            "message": self.message,
+            "data": {field: counts[pk][field]},
+            "status": status.HTTP_200_OK,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
         
 
-class CommentDislikeView(APIView):
+class CommentDislikeView(CommentLikeView):
+    """
+    Dislike a comment (once per client).
+    """
+    kind = CommentReaction.DISLIKE
+    message = "Comment disliked successfully"
+
+
+class CommentReactionBatchView(APIView):
     """
-    Dislike a comment.
+    Apply several likes/dislikes in one request.
+
+    Body: {"reactions": [{"comment": <id>, "reaction": "like" | "dislike"}, ...]}
     """
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'reactions'
 
-    def post(self, request, pk):
+    def post(self, request):
+        reactions = request.data.get("reactions")
+        max_batch = getattr(settings, "REACTION_BATCH_LIMIT", 100)
+        if not isinstance(reactions, list) or not reactions or len(reactions) > max_batch:
+            return Response(
+                {"message": f"reactions must be a list of 1 to {max_batch} items", "status": status.HTTP_400_BAD_REQUEST},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
         try:
-            comment = Comment.objects.get(pk=pk)
-            comment.dislikes += 1
-            comment.save()
-            response_data = {
-                "message": "Comment disliked successfully",
-                "data": {"dislikes": comment.dislikes},
-                "status": status.HTTP_200_OK,
-            }
-            return Response(response_data, status=status.HTTP_200_OK)
-        except Comment.DoesNotExist:
+            pairs = [(int(item["comment"]), item["reaction"]) for item in reactions]
+        except (TypeError, KeyError, ValueError):
             return Response(
-                {"message": "Comment not found", "status": status.HTTP_404_NOT_FOUND},
-                status=status.HTTP_404_NOT_FOUND,
+                {"message": "Each reaction needs a comment id and a reaction", "status": status.HTTP_400_BAD_REQUEST},
+                status=status.HTTP_400_BAD_REQUEST,
+            )
+        if any(kind not in COUNTER_FIELDS for _, kind in pairs):
+            return Response(
+                {"message": "reaction must be 'like' or 'dislike'", "status": status.HTTP_400_BAD_REQUEST},
+                status=status.HTTP_400_BAD_REQUEST,
             )
+
+        counts = apply_reactions(client_fingerprint(request), pairs)
+        response_data = {
+            "message": "Reactions applied successfully",
+            "data": {"comments": [{"id": pk, **values} for pk, values in counts.items()]},
+            "status": status.HTTP_200_OK,
+        }
+        return Response(response_data, status=status.HTTP_200_OK)
         
 
 
-class CommunityListCreateView(generics.ListCreateAPIView):
-    queryset = Community.objects.all()
+class CommunityListCreateView(CachedResponseMixin, ConditionalGetMixin, generics.ListCreateAPIView):
+    queryset = Community.objects.select_related('author')
     # serializer_class = CommunitySerializer
     permission_classes = [permissions.AllowAny] 
+    cache_depends_on = (Community, Author)
+    pagination_class = KeysetPagination  # opt-in via ?cursor= / ?page_size=
 
     def get_serializer_class(self):
         if self.request.method == 'POST':
             return CommunityCreateUpdateSerializer
         return CommunitySerializer
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        tag = self.request.query_params.get('tag')
+        if tag:
+            queryset = filter_by_tag(queryset, tag)
+        return queryset
+
+
+    def get_validators(self, request, *args, **kwargs):
+        return list_validators(self, self.cache_depends_on)
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -681,7 +893,7 @@ class CommunityListCreateView(generics.ListCreateAPIView):
             status_code=status.HTTP_201_CREATED
         )
 
-class CommunityDetailView(generics.RetrieveUpdateDestroyAPIView):
+class CommunityDetailView(ConditionalGetMixin, generics.RetrieveUpdateDestroyAPIView):
     queryset = Community.objects.all()
     # serializer_class = CommunitySerializer
     permission_classes = [permissions.AllowAny] 
@@ -695,16 +907,25 @@ class CommunityDetailView(generics.RetrieveUpdateDestroyAPIView):
     def get_object(self):
         return get_object_or_404(Community, slug=self.kwargs["slug"])
 
+    def get_validators(self, request, *args, **kwargs):
+        self.metadata = post_metadata(Community.objects.filter(slug=kwargs["slug"]))
+        return post_validators(self.metadata)
+
+    def not_modified(self, request, *args, **kwargs):
+        # A revalidated visit is still a view.
+        view_counter.increment(Community, self.metadata["pk"])
+
     def retrieve(self, request, *args, **kwargs):
-        blog = self.get_object()
-        blog.views += 1
-        blog.save(update_fields=["views"])
-        
-        response = super().retrieve(request, *args, **kwargs)
+        community = self.get_object()
+        # Show the view count including increments not flushed yet.
+        community.views += view_counter.pending(Community, community.pk) + 1
+        view_counter.increment(Community, community.pk)
+
+        serializer = self.get_serializer(community)
         return custom_response(
             success=True,
             message="Community retrieved successfully",
-            data=response.data
+            data=serializer.data
         )
 
     def update(self, request, *args, **kwargs):
@@ -724,10 +945,16 @@ class CommunityDetailView(generics.RetrieveUpdateDestroyAPIView):
         )
 
     
-class PopularCommunityView(generics.ListAPIView):
-    queryset = Community.objects.all().order_by("-views")[:5]
+class PopularCommunityView(CachedResponseMixin, generics.ListAPIView):
+    """
+    Top 5 trending community posts, optionally within ?category=.
+    """
     serializer_class = CommunitySerializer
     permission_classes = [permissions.AllowAny]
+    cache_depends_on = (Community, Author)
+
+    def get_queryset(self):
+        return top_posts(Community, category=self.request.query_params.get("category")).select_related("author")
 
     def list(self, request, *args, **kwargs):
         response = super().list(request, *args, **kwargs)
@@ -738,55 +965,22 @@ class PopularCommunityView(generics.ListAPIView):
         )
 
 class CommunityDataView(APIView):
+    """
+    Serves the precomputed community-data snapshot (see api/snapshots.py).
+    """
     permission_classes = [permissions.AllowAny]
 
     def get(self, request):
-        categories = Community.objects.values_list("category", flat=True).distinct()
-
-        community = Community.objects.all().order_by('-date')
-        serialized_community = CommunitySerializer(community, many=True).data
+        return snapshot_response(request, COMMUNITY_DATA)
 
-        community_list = [
-            {
-                "id": community["id"],
-                "title": community["title"],
-                "description": community["description"][:100],
-                "image": community["cover_image"],
-                "category": community["category"],
-                "slug": community["slug"],
-                "views": community["views"],
-            }
-            for community in serialized_community
-        ]
-
-        popular_community = Community.objects.all().order_by('-views')[:5]
-        popular_events = [
-            {"id": community.id, "title": community.title, "link": f"/community/{community.slug}/"}
-            for community in popular_community
-        ]
 
-        # Dynamic Sidebar Content
-        sidebar_content = {
-            "popularEvents": popular_events,
-            "tags": Community.objects.values_list("tags", flat=True).distinct(),  # Get unique tags
-        }
-
-        # Construct response
-        CommunityData = {
-            "categories": list(categories),
-            "community": community_list,
-            "sidebarContent": sidebar_content,
-        }
-
-        return Response(CommunityData, status=200)
-
-
-class UserProfileView(APIView):
+class UserProfileView(CachedResponseMixin, APIView):
     permission_classes = [permissions.AllowAny]  # or IsAuthenticated if needed
+    cache_depends_on = (User, Author)
 
     def get(self, request, email):
         try:
-            user = User.objects.get(email__iexact=email)
+            user = User.objects.select_related('author').get(email_normalized=normalize_email_key(email))
         except User.DoesNotExist:
             return standard_response(
                 status=False,
@@ -804,49 +998,63 @@ class UserProfileView(APIView):
         )
 
 
-class DashboardStatsView(APIView):
+class DashboardStatsView(CachedResponseMixin, APIView):
+    """
+    Dashboard statistics answered from the PostRollup buckets.
+
+    Optional query params: from / to (YYYY-MM-DD, default: this year so
+    far) and granularity (month or day, default month).
+    """
     permission_classes = [permissions.AllowAny]
+    cache_depends_on = (Blog, Community)
 
     def get(self, request):
-        current_year = now().year
-
-        # 1. Monthly Blog Posts for the current year
-        monthly_blog_data = (
-            Blog.objects.filter(date__year=current_year)
-            .annotate(month=TruncMonth("date"))
-            .values("month")
-            .annotate(count=Count("id"))
-            .order_by("month")
-        )
+        today = now().date()
+        granularity = request.query_params.get("granularity", PostRollup.MONTH)
+        try:
+            start = parse_date(request.query_params.get("from") or "") or today.replace(month=1, day=1)
+            end = parse_date(request.query_params.get("to") or "") or today
+        except ValueError:
+            start = end = None
+        if start is None or end is None or start > end or granularity not in (PostRollup.DAY, PostRollup.MONTH):
+            return standard_response(
+                status=False,
+                message="Invalid from/to dates or granularity",
+                status_code=status.HTTP_400_BAD_REQUEST
+            )
+        has_range = "from" in request.query_params or "to" in request.query_params
+        series_start = start.replace(day=1) if granularity == PostRollup.MONTH else start
 
-        monthly_blog_posts = {
-            entry["month"].strftime("%B"): entry["count"]
-            for entry in monthly_blog_data
-        }
+        # 1. Blog posts per bucket in the range
+        blog_series = rollup_series("blog", granularity, series_start, end)
+        community_series = rollup_series("community", granularity, series_start, end)
+
+        # Month name -> count, as before (only meaningful within one year)
+        monthly_blog_posts = {}
+        if granularity == PostRollup.MONTH and start.year == end.year:
+            monthly_blog_posts = {period.strftime("%B"): count for period, count in blog_series}
 
         # 2. Latest 5 blogs
-        latest_blogs = Blog.objects.all().order_by("-date")[:5]
+        latest_blogs = Blog.objects.select_related("author").order_by("-date")[:5]
         latest_blogs_data = BlogSummarySerializer(latest_blogs, many=True).data
 
-        # 3. Community event distribution (by category)
-        community_distribution = (
-            Community.objects.values("category")
-            .annotate(count=Count("id"))
-            .order_by("-count")
-        )
-
-        # 4. Totals (optional)
-        total_blogs = Blog.objects.count()
-        total_communities = Community.objects.count()
+        # 3. Community event distribution (by category); all-time unless a range was given
+        if has_range:
+            community_distribution = rollup_by_category("community", start, end)
+        else:
+            community_distribution = rollup_by_category("community")
 
         # Construct response
         data = {
+            "range": {"from": start, "to": end, "granularity": granularity},
             "monthly_blog_posts": monthly_blog_posts,
+            "blog_posts": [{"period": period, "count": count} for period, count in blog_series],
+            "community_posts": [{"period": period, "count": count} for period, count in community_series],
             "latest_blogs": latest_blogs_data,
-            "community_distribution": list(community_distribution),
+            "community_distribution": community_distribution,
             "totals": {
-                "blogs": total_blogs,
-                "communities": total_communities,
+                "blogs": rollup_total("blog"),
+                "communities": rollup_total("community"),
             }
         }
 
@@ -855,4 +1063,4 @@ class DashboardStatsView(APIView):
             message="Dashboard stats fetched successfully",
             data=data,
             status_code=status.HTTP_200_OK
-        )
\ No newline at end of file
+        )
@@ -109,6 +109,34 @@ AUTH_PASSWORD_VALIDATORS = [
     },
 ]
 
+# Password hashing profile (api/hashers.py): the hasher and work factor for
+# new password hashes. Hashes from another profile are upgraded on the
+# user's next login. Compare profiles with ``manage.py bench_logins``.
+PASSWORD_HASHER_PROFILES = {
+    'pbkdf2': {'hasher': 'api.hashers.PBKDF2PasswordHasher', 'iterations': 1_000_000},
+    'pbkdf2-600k': {'hasher': 'api.hashers.PBKDF2PasswordHasher', 'iterations': 600_000},
+    'scrypt': {'hasher': 'api.hashers.ScryptPasswordHasher', 'work_factor': 2 ** 14},
+}
+PASSWORD_HASHER_PROFILE = 'pbkdf2'
+PASSWORD_HASHERS = list(dict.fromkeys(
+    [PASSWORD_HASHER_PROFILES[PASSWORD_HASHER_PROFILE]['hasher']]
+    + [profile['hasher'] for profile in PASSWORD_HASHER_PROFILES.values()]
+    # Django's other default hashers, so existing hashes made with them
+    # still verify (and are upgraded on login).
+    + [
+        'django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher',
+        'django.contrib.auth.hashers.Argon2PasswordHasher',
+        'django.contrib.auth.hashers.BCryptSHA256PasswordHasher',
+    ]
+))
+
+# At most this many password hashes (login, registration, reset) run at
+# once across all workers, about one per core; others queue for a slot and
+# are answered 429 only after waiting PASSWORD_CHECK_TIMEOUT seconds.
+PASSWORD_CHECK_CONCURRENCY = os.cpu_count() or 2
+PASSWORD_CHECK_TIMEOUT = 10
+PASSWORD_CHECK_LOCK_FILE = BASE_DIR / 'cache' / 'password-checks.lock'
+
 
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
@@ -134,10 +162,15 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
 
 REST_FRAMEWORK = {
-    'DEFAULT_AUTHENTICATION_CLASSES': [],
+    # Verifies simplejwt access tokens without a user query (api/authentication.py).
+    'DEFAULT_AUTHENTICATION_CLASSES': [
+        'api.authentication.ClaimsJWTAuthentication',
+    ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.AllowAny',
     ],
+    # nginx appends the client address to X-Forwarded-For; throttles key on it.
+    'NUM_PROXIES': 1,
 }
 
 
@@ -208,3 +241,115 @@ BACKEND_URL = 'https://millibackend.amilliontechies.com'
 # BACKEND_URL = 'http:127.0.0.1:5000' 
 FRONTEND_URL = 'https://amilliontechies.com'
 # FRONTEND_URL = 'http:127.0.0.1:5173'
+
+# Keyset pagination for list endpoints (opt-in with ?cursor= / ?page_size=)
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
+# Rebuild blog-data / community-data snapshots at least this often (seconds)
+# so view counts and popular posts do not drift too far.
+SNAPSHOT_MAX_AGE = 300
+
+# Detail-page view counts are buffered in memory and written in batches.
+# Counts in the database lag by at most this many seconds (a background
+# thread flushes idle workers) or this many pending views.
+VIEW_COUNT_FLUSH_INTERVAL = 30
+VIEW_COUNT_FLUSH_SIZE = 200
+
+# Trending scores halve in weight every this many hours.
+# Run `manage.py rebuild_trending` after changing it.
+TRENDING_HALF_LIFE_HOURS = 72
+
+# Replies embedded per thread in comment listings; the rest are fetched
+# from /api/comments/<id>/replies/.
+COMMENT_REPLIES_PER_THREAD = 20
+
+# Comment reactions: expected distinct (comment, client) pairs per worker
+# before the dedup filter is reset, and the max reactions per batch request.
+REACTION_BLOOM_CAPACITY = 100000
+REACTION_BATCH_LIMIT = 100
+
+# Response cache for public GET endpoints (see api/response_cache.py).
+# The file-based cache is shared by every worker on the host, so model
+# writes invalidate cached responses everywhere; locmem also works for a
+# single process.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    'responses': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'responses'),
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
+    # Per-model invalidation versions only, so they are never culled.
+    'response_versions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.path.join(BASE_DIR, 'cache', 'response_versions'),
+    },
+}
+RESPONSE_CACHE_ALIAS = 'responses'
+RESPONSE_CACHE_VERSIONS_ALIAS = 'response_versions'
+# Seconds an expired response is still served while one request refreshes it.
+RESPONSE_CACHE_STALE = 300
+
+# Rows fetched and serialized per batch by streamed list responses
+# (api/streaming.py).
+STREAM_CHUNK_SIZE = 500
+
+# Responsive image variants (api/images.py): widths in pixels, rendered as
+# WebP and JPEG at this quality. Run `manage.py build_image_variants
+# --force` after changing them.
+IMAGE_VARIANT_WIDTHS = (320, 640, 1024, 1600)
+IMAGE_VARIANT_QUALITY = 80
+# A worker building a row's variants holds it this many seconds at most.
+IMAGE_VARIANT_CLAIM_TIMEOUT = 600
+
+# Email outbox (api/outbox.py), drained by `manage.py send_outbox`.
+# Rejected sends are retried after OUTBOX_RETRY_DELAY seconds, doubling each
+# attempt, up to OUTBOX_MAX_ATTEMPTS. An unreachable server defers the
+# messages by OUTBOX_RETRY_DELAY without counting an attempt.
+OUTBOX_BATCH_SIZE = 50
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 60
+OUTBOX_CLAIM_TIMEOUT = 600
+OUTBOX_POLL_INTERVAL = 5
+
+# Newsletter campaigns (`manage.py send_campaign <id>`): progress is
+# checkpointed every NEWSLETTER_BATCH_SIZE subscribers, and sending is
+# paced to NEWSLETTER_RATE_LIMIT messages per second. A run's claim on a
+# campaign expires NEWSLETTER_CLAIM_TIMEOUT seconds after its last
+# checkpoint, after which another run may take over.
+NEWSLETTER_BATCH_SIZE = 100
+NEWSLETTER_RATE_LIMIT = 10
+NEWSLETTER_CLAIM_TIMEOUT = 600
+
+# Full User rows behind JWT claims are cached per worker for this many
+# seconds (api/authentication.py), up to JWT_USER_CACHE_SIZE users.
+JWT_USER_CACHE_TTL = 60
+JWT_USER_CACHE_SIZE = 1000
+
+# Revoked JWTs (api/revocation.py): workers pull new revocations at most
+# this often (seconds), and purge expired ones every COMPACT_INTERVAL.
+REVOCATION_REFRESH_INTERVAL = 5
+REVOCATION_COMPACT_INTERVAL = 600
+REVOCATION_BLOOM_CAPACITY = 10000
+
+# Token-bucket limits for anonymous writes (api/throttling.py), shared by
+# all workers through THROTTLE_STATE_FILE. Each entry is (refill rate,
+# burst size) per client; 'ip' covers every throttled request, the others
+# one view's throttle_scope.
+THROTTLE_STATE_FILE = BASE_DIR / 'cache' / 'throttle.bin'
+THROTTLE_SLOTS = 65536
+THROTTLE_BUCKETS = {
+    'ip': ('120/min', 60),
+    'comments': ('10/min', 5),
+    'reactions': ('60/min', 30),
+    'contact': ('5/hour', 3),
+    'newsletter': ('5/hour', 3),
+    'joinus': ('5/hour', 3),
+    'send_email': ('5/hour', 3),
+    'register': ('5/hour', 3),
+    'login': ('10/min', 5),
+    'password_reset': ('5/hour', 3),
+}
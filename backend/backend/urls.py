@@ -21,8 +21,10 @@ schema_view = get_schema_view(
 urlpatterns = [
     path('admin/', admin.site.urls),
     path('api/register/', UserCreateView.as_view(), name='user-register'),
-    path('api/profile/', UserProfileView.as_view(), name='user-profile'),
+    path('api/profile/', CurrentUserProfileView.as_view(), name='user-profile'),
     path('api/token/', CustomTokenObtainPairView.as_view(), name='token-obtain-pair'),
+    path('api/token/refresh/', CustomTokenRefreshView.as_view(), name='token-refresh'),
+    path('api/logout/', LogoutView.as_view(), name='logout'),
     path('api/password-reset/', PasswordResetView.as_view(), name='password-reset'),
     path('api/password-reset-confirm/', PasswordResetConfirmView.as_view(), name='password-reset-confirm'),
     path('aoi/verify-email/', EmailVerificationView.as_view(), name='verify-email'),
@@ -37,9 +39,12 @@ urlpatterns = [
     path('api/blogs/<slug:slug>/', BlogDetailView.as_view(), name='blog_detail'),
     path("api/blog-data/", BlogDataView.as_view(), name="blog-data"),
     path("api/popularBlogs/", PopularBlogsView.as_view(), name="blog-data"),
+    path("api/search/", SearchView.as_view(), name="search"),
     path('api/comments/', CommentListCreateView.as_view(), name='comment_list_create'),
+    path('api/comments/reactions/', CommentReactionBatchView.as_view(), name='comment_reactions'),
     path('api/comments/blog/<int:postId>/', CommentListCreateView.as_view(), name='comment_list_by_blog'),
     path('api/comments/<int:pk>/', CommentDetailView.as_view(), name='comment_detail'),
+    path('api/comments/<int:pk>/replies/', CommentRepliesView.as_view(), name='comment_replies'),
     path('api/comments/<int:pk>/like/', CommentLikeView.as_view(), name='comment_like_detail'),
     path('api/comments/<int:pk>/dislike/', CommentDislikeView.as_view(), name='comment_dislike_detail'),
     path('api/community/', CommunityListCreateView.as_view(), name='community_list_create'),
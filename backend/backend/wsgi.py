@@ -14,3 +14,9 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 
 application = get_wsgi_application()
+
+# Image variant jobs live in worker memory; pick up any a previous
+# process left unfinished.
+from api.images import image_worker  # noqa: E402
+
+image_worker.requeue_pending()
@@ -4,18 +4,21 @@ from .serializers import JoinUsPageConfigSerializer, JoinUsSubmissionSerializer
 from rest_framework import status, generics, permissions
 from rest_framework.views import APIView
 from api.utils import custom_response
-from django.core.mail import send_mail
+from api.response_cache import CachedResponseMixin
+from api.outbox import enqueue_email
+from api.throttling import SharedBucketThrottle
 from django.conf import settings
 import logging
-from django.core.mail import EmailMultiAlternatives
 from datetime import datetime
 from django.template.loader import render_to_string
 
 logger = logging.getLogger(__name__)    
 
-class JoinUsConfigView(generics.RetrieveAPIView):
+class JoinUsConfigView(CachedResponseMixin, generics.RetrieveAPIView):
     queryset = JoinUsPageConfig.objects.all()
     serializer_class = JoinUsPageConfigSerializer
+    cache_ttl = 600
+    cache_depends_on = (JoinUsPageConfig,)
 
     def get_object(self):
         return self.get_queryset().first()
@@ -23,6 +26,8 @@ class JoinUsConfigView(generics.RetrieveAPIView):
 class SendCustomEmailView(APIView):
     
     permission_classes = [permissions.AllowAny] 
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'send_email'
 
     def post(self, request):
         subject = request.data.get('subject')
@@ -36,7 +41,7 @@ class SendCustomEmailView(APIView):
                 status_code=status.HTTP_400_BAD_REQUEST
             )
 
-        send_mail(subject, message, 'your_email@example.com', recipient_list)
+        enqueue_email(subject, message, recipient_list)
 
         return custom_response(
             success=True,
@@ -49,6 +54,8 @@ class JoinUsSubmissionView(generics.CreateAPIView):
     queryset = JoinUsSubmission.objects.all()
     serializer_class = JoinUsSubmissionSerializer
     permission_classes = [permissions.AllowAny]
+    throttle_classes = [SharedBucketThrottle]
+    throttle_scope = 'joinus'
 
     def create(self, request, *args, **kwargs):
         try:
@@ -76,13 +83,15 @@ class JoinUsSubmissionView(generics.CreateAPIView):
                 "— The Team @amilliontechies"
             )
 
-            email = EmailMultiAlternatives(subject, text_content, from_email, to_email)
-            email.attach_alternative(html_content, "text/html")
-           # email.send()
-            try:
-                email.send()
-            except Exception as e:
-                print("Email sending failed: ", e)
+            # Queued in the outbox; `manage.py send_outbox` delivers it.
+            enqueue_email(
+                subject,
+                text_content,
+                to_email,
+                html_body=html_content,
+                from_email=from_email,
+                dedup_key=f"joinus-confirmation:{submitted_data.get('id')}",
+            )
 
 
             return custom_response(
@@ -10,9 +10,11 @@ if [ "$EUID" -ne 0 ]; then
 fi
 
 install -m 0644 "$DEPLOYMENT_ROOT/systemd/amilliontechies-backend.service.example" /etc/systemd/system/amilliontechies-backend.service
+install -m 0644 "$DEPLOYMENT_ROOT/systemd/amilliontechies-outbox.service.example" /etc/systemd/system/amilliontechies-outbox.service
 install -m 0644 "$DEPLOYMENT_ROOT/nginx/amilliontechies.conf.example" /etc/nginx/conf.d/amilliontechies.conf
 
 systemctl daemon-reload
 systemctl enable amilliontechies-backend.service
+systemctl enable amilliontechies-outbox.service
 
 echo "Deployment templates installed."